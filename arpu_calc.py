@@ -1,9 +1,32 @@
-import math
-import statistics
+import io
+import os
+import sqlite3
+import pandas as pd
 import streamlit as st
-from scipy import stats
-import plotly.graph_objects as go
-import plotly.express as px
+from streamlit.errors import StreamlitAPIException
+import segments
+import duration
+import srm
+import result_cache
+import quantiles
+import columnar
+import export
+from report import metric_verdicts
+from calculations import (
+    MIN_TEST_DAYS,
+    SIGNIFICANCE_LEVEL,
+    MARGINAL_SIGNIFICANCE_LEVEL,
+    analyze_experiment,
+    analyze_sufficient_stats,
+    calculate_sample_size_per_variant,
+    calculate_days_needed,
+    calculate_srm,
+)
+from charts import (
+    create_comparison_chart,
+    create_traffic_forecast_chart,
+    create_cumulative_rate_chart,
+)
 
 # Page Config
 st.set_page_config(
@@ -173,142 +196,74 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def calculate_welch_t_test(mean_A, sd_A, n_A, mean_B, sd_B, n_B):
-    """Welch's t-test for unequal variances"""
-    if n_A < 2 or n_B < 2:
-        return None, None, None
-    
-    se_diff = math.sqrt((sd_A ** 2) / n_A + (sd_B ** 2) / n_B)
-    if se_diff == 0:
-        return None, None, None
-    
-    t_stat = (mean_B - mean_A) / se_diff
-    df = ((sd_A ** 2 / n_A) + (sd_B ** 2 / n_B)) ** 2 / (
-         ((sd_A ** 2 / n_A) ** 2) / (n_A - 1) + ((sd_B ** 2 / n_B) ** 2) / (n_B - 1)
-    )
-    p_value = 2 * stats.t.sf(abs(t_stat), df)
-    
-    return t_stat, df, p_value
-
-def calculate_z_test_conversion(conv_A, n_A, conv_B, n_B):
-    """Z-test for conversion rate comparison"""
-    p_A = conv_A / 100
-    p_B = conv_B / 100
-    
-    p_pooled = ((p_A * n_A) + (p_B * n_B)) / (n_A + n_B)
-    se = math.sqrt(p_pooled * (1 - p_pooled) * (1/n_A + 1/n_B))
-    
-    if se == 0:
-        return None, None
-    
-    z_stat = (p_B - p_A) / se
-    p_value = 2 * (1 - stats.norm.cdf(abs(z_stat)))
-    
-    return z_stat, p_value
+@st.cache_data(show_spinner="Aggregating segments...")
+def load_segment_stats(file_bytes, segment_col, arm_col, revenue_col):
+    """Per-segment sufficient statistics for an uploaded file, cached by content"""
+    return segments.read_segment_stats(io.BytesIO(file_bytes), segment_col, arm_col, revenue_col)
+
+@st.cache_resource
+def get_result_cache():
+    """Process-wide handle on the shared on-disk result cache (None if unavailable)"""
+    try:
+        return result_cache.ResultCache()
+    except (OSError, sqlite3.Error):
+        return None
 
-def create_comparison_chart(control_val, variant_val, metric_name, is_currency=False):
-    """Create a beautiful comparison bar chart"""
+def run_cached(namespace, compute, inputs):
+    """compute(**inputs) through the shared result cache, falling back to a direct call"""
+    cache = get_result_cache()
+    if cache is None:
+        return compute(**inputs)
     
-    fig = go.Figure()
-    
-    # Format text based on metric type
-    if is_currency:
-        control_text = f'${control_val:.2f}'
-        variant_text = f'${variant_val:.2f}'
-    else:
-        control_text = f'{control_val:.2f}%'
-        variant_text = f'{variant_val:.2f}%'
-    
-    fig.add_trace(go.Bar(
-        name='Control',
-        x=['Control'],
-        y=[control_val],
-        marker_color='#94a3b8',
-        text=[control_text],
-        textposition='outside',
-        textfont=dict(size=14, family='Inter', color='#1e293b'),
-        width=0.5
-    ))
-    
-    fig.add_trace(go.Bar(
-        name='Variant',
-        x=['Variant'],
-        y=[variant_val],
-        marker_color='#667eea',
-        text=[variant_text],
-        textposition='outside',
-        textfont=dict(size=14, family='Inter', color='#1e293b'),
-        width=0.5
-    ))
-    
-    # Calculate max value for proper y-axis range
-    max_val = max(control_val, variant_val)
-    
-    fig.update_layout(
-        title=dict(
-            text=metric_name, 
-            font=dict(size=16, family='Inter', color='#1e293b'),
-            x=0.5,
-            xanchor='center'
-        ),
-        showlegend=False,
-        paper_bgcolor='white',
-        plot_bgcolor='white',
-        height=300,
-        margin=dict(l=20, r=20, t=80, b=40),  # Increased top margin
-        yaxis=dict(
-            showgrid=True, 
-            gridcolor='#f1f5f9', 
-            zeroline=False,
-            title=None,
-            range=[0, max_val * 1.25]  # Add 25% padding above bars for labels
-        ),
-        xaxis=dict(
-            showgrid=False,
-            title=None
+    try:
+        return cache.get_or_compute(
+            result_cache.make_key(namespace, inputs),
+            lambda: compute(**inputs)
         )
-    )
-    
-    return fig
-def calculate_sample_size_per_variant(baseline_rate, mde, alpha=0.05, power=0.80):
+    except sqlite3.Error:
+        return compute(**inputs)
+
+def run_analysis(inputs):
+    """analyze_experiment through the shared result cache"""
+    return run_cached("analysis", analyze_experiment, inputs)
+
+@st.cache_data(show_spinner="Reading export...")
+def load_export_stats(path, modified, size, arm_col, revenue_col):
+    """Per-arm sufficient statistics of a server-side export, cached until the file changes"""
+    return columnar.read_arm_stats(path, arm_col, revenue_col)
+
+@st.cache_data
+def load_daily_series(file_bytes):
+    """Parsed daily series for an uploaded file, cached by content"""
+    return duration.read_daily_series(io.BytesIO(file_bytes))
+
+def rerun_sections(*sections):
     """
-    Calculate required sample size per variant for conversion rate tests
-    baseline_rate: baseline conversion rate (as decimal, e.g., 0.028 for 2.8%)
-    mde: minimum detectable effect (as decimal, e.g., 0.10 for 10% relative lift)
-    alpha: significance level (default 0.05 for 95% confidence)
-    power: statistical power (default 0.80)
+    Widget callback: rerun only the page sections (fragment keys) that depend
+    on the widget instead of the whole script
     """
-    # Calculate the alternative conversion rate
-    p1 = baseline_rate
-    p2 = baseline_rate * (1 + mde)
-    
-    # Z-scores for alpha and power
-    z_alpha = stats.norm.ppf(1 - alpha / 2)
-    z_beta = stats.norm.ppf(power)
-    
-    # Pooled probability
-    p_avg = (p1 + p2) / 2
-    
-    # Sample size formula for two proportions
-    n = ((z_alpha * math.sqrt(2 * p_avg * (1 - p_avg)) + 
-          z_beta * math.sqrt(p1 * (1 - p1) + p2 * (1 - p2))) ** 2) / ((p2 - p1) ** 2)
-    
-    return math.ceil(n)
-
-def calculate_days_needed(required_visitors, current_visitors, days_elapsed):
-    """Calculate additional days needed based on current traffic rate"""
-    if days_elapsed <= 0:
+    try:
+        st.rerun(list(sections))
+    except StreamlitAPIException:
+        # Sections not rendered yet (e.g. the last run stopped early): full rerun
+        pass
+
+def current_daily_series():
+    """Daily series from the forecast uploader, or None (errors are reported by the forecast)"""
+    daily_file = st.session_state.get("daily_file")
+    if daily_file is None:
         return None
     
-    visitors_per_day = current_visitors / days_elapsed
-    
-    if visitors_per_day <= 0:
+    try:
+        daily_series = load_daily_series(daily_file.getvalue())
+    except (ValueError, KeyError):
         return None
-    
-    days_needed = math.ceil(required_visitors / visitors_per_day)
-    additional_days = max(0, days_needed - days_elapsed)
-    
-    return days_needed, additional_days
+    return None if daily_series.empty else daily_series
+
+def series_baseline_rate(daily_series, baseline_conv_rate):
+    """Control conversion rate of a daily series, or the manual one when the series has no control conversions"""
+    series_rate = duration.series_baseline(daily_series)["baseline_rate"]
+    return series_rate if series_rate > 0 else baseline_conv_rate
 
 # Header
 st.markdown("<h1>🎯 CRO Test Calculator</h1>", unsafe_allow_html=True)
@@ -319,25 +274,41 @@ st.markdown("---")
 # Input Section
 st.markdown("## ⚙️ Test Configuration")
 
-config_col1, config_col2 = st.columns(2)
+config_col1, config_col2, config_col3 = st.columns(3)
 
 with config_col1:
-    days_live = st.number_input(
+    st.number_input(
         "Days Live", 
         min_value=0, 
         value=7, 
         step=1, 
-        help="How many days has this test been running?"
+        help="How many days has this test been running?",
+        key="days_live",
+        on_change=rerun_sections,
+        args=("sample_size", "duration_advice")
     )
 
 with config_col2:
-    mde_percent = st.number_input(
+    st.number_input(
         "Minimum Detectable Effect (MDE %)", 
         min_value=1.0, 
         max_value=100.0, 
         value=10.0, 
         step=1.0,
-        help="The smallest lift you want to be able to detect. Typically 5-15% for conversion tests."
+        help="The smallest lift you want to be able to detect. Typically 5-15% for conversion tests.",
+        key="mde_percent",
+        on_change=rerun_sections,
+        args=("sample_size", "duration_advice", "daily_forecast", "results_download")
+    )
+
+with config_col3:
+    variant_share_percent = st.number_input(
+        "Variant Traffic Split (%)",
+        min_value=1.0,
+        max_value=99.0,
+        value=50.0,
+        step=5.0,
+        help="Share of visitors the test is configured to send to the variant. Used to detect sample ratio mismatch."
     )
 
 st.markdown("---")
@@ -366,40 +337,95 @@ with col_b:
         key="variant_revenue"
     )
 
-# Parse revenues
+# Server-side exports are only offered when an export directory is configured,
+# and entered paths can't leave it
+export_dir = os.environ.get("CRO_EXPORT_DIR")
+export_path = ""
+export_stats = None
+if export_dir:
+    with st.expander("📂 Load a large order-level export instead"):
+        export_entry = st.text_input(
+            "Export path",
+            help="Path relative to the export directory of a .npy, Arrow IPC (.arrow/.feather) or Parquet file, or a directory of per-column .npy files, with one row per visitor: an arm column and a revenue column (0 for visitors who didn't buy). The file is memory-mapped, so exports with hundreds of millions of rows load in seconds."
+        ).strip()
+        
+        export_columns = []
+        if export_entry:
+            export_path = columnar.resolve_export_path(export_dir, export_entry)
+            if export_path is None:
+                st.error("⚠️ The export must be inside the export directory.")
+                export_path = ""
+            else:
+                try:
+                    export_columns = columnar.read_column_names(export_path)
+                except (OSError, ValueError, ImportError):
+                    st.error("⚠️ Could not open the export. Check the path and that it's a supported format.")
+            
+            if export_columns:
+                export_col1, export_col2 = st.columns(2)
+                with export_col1:
+                    export_arm_col = st.selectbox(
+                        "Arm column",
+                        export_columns,
+                        index=export_columns.index("arm") if "arm" in export_columns else 0,
+                        key="export_arm_col"
+                    )
+                with export_col2:
+                    export_revenue_col = st.selectbox(
+                        "Revenue column",
+                        export_columns,
+                        index=export_columns.index("revenue") if "revenue" in export_columns else 0,
+                        key="export_revenue_col"
+                    )
+                
+                try:
+                    export_file = os.stat(export_path)
+                    export_stats = load_export_stats(
+                        export_path, export_file.st_mtime_ns, export_file.st_size, export_arm_col, export_revenue_col
+                    )
+                except (OSError, ValueError, KeyError, TypeError):
+                    st.error("⚠️ Error reading the export. Check the arm and revenue columns.")
+                
+                if export_stats is not None and (export_stats["visitors_A"] == 0 or export_stats["visitors_B"] == 0):
+                    st.error("⚠️ No visitors found for one of the arms. Check the arm column contains control/variant (or A/B, 0/1) labels.")
+                    export_stats = None
+
+if export_stats is not None:
+    n_A, n_purchasers_A = export_stats["visitors_A"], export_stats["conversions_A"]
+    n_B, n_purchasers_B = export_stats["visitors_B"], export_stats["conversions_B"]
+    st.info(f"📂 Analyzing **{os.path.basename(export_path)}**: {n_A:,} control and {n_B:,} variant visitors. The manual inputs above are ignored.")
+
+# Analyze, sharing results across sessions and replicas through the result cache.
+# Normalize the revenue lists to the tokens the parser sees so formatting-only
+# differences (spaces, trailing commas) still hit the same entry.
+analysis_inputs = {
+    "n_A": n_A,
+    "n_purchasers_A": n_purchasers_A,
+    "revenue_text_A": ",".join(x.strip() for x in revenue_A.split(',') if x.strip()),
+    "n_B": n_B,
+    "n_purchasers_B": n_purchasers_B,
+    "revenue_text_B": ",".join(x.strip() for x in revenue_B.split(',') if x.strip()),
+}
+
 try:
-    purchaser_revenues_A = [float(x.strip()) for x in revenue_A.split(',') if x.strip()][:n_purchasers_A]
-    purchaser_revenues_B = [float(x.strip()) for x in revenue_B.split(',') if x.strip()][:n_purchasers_B]
-except:
+    results = analyze_sufficient_stats(**export_stats) if export_stats is not None else run_analysis(analysis_inputs)
+except ValueError:
     st.error("⚠️ Error parsing revenue values. Please check your input.")
     st.stop()
 
-# Extend with actual number of conversions
-if len(purchaser_revenues_A) < n_purchasers_A:
-    avg_rev_A = statistics.mean(purchaser_revenues_A) if purchaser_revenues_A else 0
-    purchaser_revenues_A.extend([avg_rev_A] * (n_purchasers_A - len(purchaser_revenues_A)))
-
-if len(purchaser_revenues_B) < n_purchasers_B:
-    avg_rev_B = statistics.mean(purchaser_revenues_B) if purchaser_revenues_B else 0
-    purchaser_revenues_B.extend([avg_rev_B] * (n_purchasers_B - len(purchaser_revenues_B)))
-
-# Create full revenue arrays
-full_revenues_A = purchaser_revenues_A + [0.0] * (n_A - n_purchasers_A)
-full_revenues_B = purchaser_revenues_B + [0.0] * (n_B - n_purchasers_B)
-
 # Calculate metrics
-conv_rate_A = (n_purchasers_A / n_A) * 100 if n_A > 0 else 0
-conv_rate_B = (n_purchasers_B / n_B) * 100 if n_B > 0 else 0
+conv_rate_A = results["conv_rate_A"]
+conv_rate_B = results["conv_rate_B"]
 
-aov_A = statistics.mean(purchaser_revenues_A) if purchaser_revenues_A else 0
-aov_B = statistics.mean(purchaser_revenues_B) if purchaser_revenues_B else 0
-sd_aov_A = statistics.stdev(purchaser_revenues_A) if len(purchaser_revenues_A) > 1 else 0
-sd_aov_B = statistics.stdev(purchaser_revenues_B) if len(purchaser_revenues_B) > 1 else 0
+aov_A = results["aov_A"]
+aov_B = results["aov_B"]
+sd_aov_A = results["sd_aov_A"]
+sd_aov_B = results["sd_aov_B"]
 
-arpu_A = sum(full_revenues_A) / n_A if n_A > 0 else 0
-arpu_B = sum(full_revenues_B) / n_B if n_B > 0 else 0
-sd_arpu_A = statistics.stdev(full_revenues_A) if n_A > 1 else 0
-sd_arpu_B = statistics.stdev(full_revenues_B) if n_B > 1 else 0
+arpu_A = results["arpu_A"]
+arpu_B = results["arpu_B"]
+sd_arpu_A = results["sd_arpu_A"]
+sd_arpu_B = results["sd_arpu_B"]
 
 st.markdown("---")
 
@@ -408,75 +434,223 @@ st.markdown("---")
 # Test Duration & Sample Size Analysis
 st.markdown("## ⏱️ Test Duration & Sample Size")
 
-# Calculate required sample size
+# Baseline and current totals
 baseline_conv_rate = conv_rate_A / 100  # Convert to decimal
-mde_decimal = mde_percent / 100
-required_sample_per_variant = calculate_sample_size_per_variant(baseline_conv_rate, mde_decimal)
-
-# Current totals
 total_current_visitors = n_A + n_B
 
-# Duration analysis
-duration_col1, duration_col2, duration_col3, duration_col4 = st.columns(4)
-
-with duration_col1:
-    st.metric("Days Live", f"{days_live} days")
-
-with duration_col2:
-    st.metric("Current Sample Size", f"{total_current_visitors:,}")
+# The blocks below are fragments: changing Days Live or MDE reruns only the
+# blocks that depend on them, not the parsing, tests and charts
 
-with duration_col3:
-    required_total = required_sample_per_variant * 2
-    st.metric("Required Sample Size", f"{required_total:,}")
-    st.caption(f"Based on {mde_percent}% MDE")
-
-with duration_col4:
-    sample_progress = (total_current_visitors / required_total * 100) if required_total > 0 else 0
-    st.metric("Sample Progress", f"{sample_progress:.1f}%")
+def required_sample(baseline_rate, mde_percent):
+    """Required visitors per variant and in total (None, None when the baseline is 0% or 100%)"""
+    required_sample_per_variant = calculate_sample_size_per_variant(baseline_rate, mde_percent / 100)
+    if required_sample_per_variant is None:
+        return None, None
+    return required_sample_per_variant, required_sample_per_variant * 2
 
-# Calculate days recommendation
-if days_live > 0:
-    days_result = calculate_days_needed(required_total, total_current_visitors, days_live)
+@st.fragment(key="sample_size")
+def sample_size_section(baseline_conv_rate, total_current_visitors):
+    """Sample size metrics (depend on Days Live, MDE and the uploaded daily series)"""
+    days_live, mde_percent = st.session_state["days_live"], st.session_state["mde_percent"]
+    
+    # With a daily series, use the same baseline, traffic and elapsed days as the seasonal forecast
+    daily_series = current_daily_series()
+    if daily_series is not None:
+        baseline_conv_rate = series_baseline_rate(daily_series, baseline_conv_rate)
+        days_live = duration.series_days(daily_series)
+        total_current_visitors = int((daily_series["visitors_A"] + daily_series["visitors_B"]).sum())
+    
+    required_sample_per_variant, required_total = required_sample(baseline_conv_rate, mde_percent)
+    
+    # Duration analysis
+    duration_col1, duration_col2, duration_col3, duration_col4 = st.columns(4)
+    
+    with duration_col1:
+        st.metric("Days Live", f"{days_live} days")
+        if daily_series is not None:
+            st.caption("From the uploaded daily series")
+    
+    with duration_col2:
+        st.metric("Current Sample Size", f"{total_current_visitors:,}")
+    
+    with duration_col3:
+        st.metric("Required Sample Size", f"{required_total:,}" if required_total is not None else "n/a")
+        st.caption(f"Based on {mde_percent}% MDE")
     
-    if days_result:
-        total_days_needed, additional_days = days_result
+    with duration_col4:
+        if required_total is not None:
+            sample_progress = (total_current_visitors / required_total * 100) if required_total > 0 else 0
+            st.metric("Sample Progress", f"{sample_progress:.1f}%")
+        else:
+            st.metric("Sample Progress", "n/a")
+
+@st.fragment(key="duration_advice")
+def duration_advice_section(baseline_conv_rate, total_current_visitors):
+    """Duration recommendation (depends on Days Live, MDE and the uploaded daily series)"""
+    days_live, mde_percent = st.session_state["days_live"], st.session_state["mde_percent"]
+    daily_series = current_daily_series()
+    if daily_series is not None:
+        baseline_conv_rate = series_baseline_rate(daily_series, baseline_conv_rate)
+    required_sample_per_variant, required_total = required_sample(baseline_conv_rate, mde_percent)
+    
+    if required_total is None:
+        st.info("💡 The required sample size needs a control conversion rate above 0% and below 100%. Enter the control conversions to get duration recommendations.")
+        return
+    
+    # A daily series replaces the flat-traffic estimate with the seasonal forecast
+    if daily_series is not None:
+        days_elapsed = duration.series_days(daily_series)
+        traffic_model = duration.fit_weekly_traffic(daily_series["date"], daily_series["visitors_A"] + daily_series["visitors_B"])
+        completion = duration.forecast_completion(daily_series, traffic_model, [required_total])
+        days_rounded, end_date = completion["days_rounded"][0], completion["end_date"][0]
         
         st.markdown("")  # spacing
         
-        # Recommendations
-        if total_current_visitors >= required_total and days_live >= 14:
-            st.success(f"✅ **Test is ready to conclude** — You've reached the required sample size ({required_total:,} visitors) and run for {days_live} days. You can confidently analyze results.")
-        elif total_current_visitors >= required_total and days_live < 14:
-            days_remaining = 14 - days_live
-            st.warning(f"⚠️ **Sample size reached, but run longer** — You have enough visitors, but tests should run at least 14 days to capture weekly patterns. Recommend running {days_remaining} more days.")
-        elif total_current_visitors < required_total and days_live >= 14:
-            st.warning(f"⚠️ **Need more sample size** — You've run for {days_live} days, but need approximately **{additional_days} more days** to reach {required_total:,} total visitors (based on current traffic of {total_current_visitors/days_live:.0f} visitors/day).")
+        if pd.isna(days_rounded):
+            st.warning(f"⚠️ **Not reachable within a year** — At current traffic, the {mde_percent}% MDE needs more than 365 days. Consider a larger MDE.")
+        elif days_elapsed >= days_rounded:
+            st.success(f"✅ **Test is ready to conclude** — You've reached the required sample size ({required_total:,} visitors) and run for {days_elapsed} days in full weeks. You can confidently analyze results.")
         else:
-            # Need both more time and more sample
-            days_for_sample = max(total_days_needed, 14)
-            days_remaining = days_for_sample - days_live
-            st.info(f"📊 **Continue testing** — Recommend running for approximately **{days_remaining} more days** to reach both minimum duration (14 days) and required sample size ({required_total:,} visitors).")
+            st.info(f"📊 **Continue testing** — From the seasonal forecast below, run **{days_rounded - days_elapsed:.0f} more days** (until {pd.Timestamp(end_date):%b %d, %Y}) to reach both minimum duration ({MIN_TEST_DAYS} days) and required sample size ({required_total:,} visitors), in full weeks.")
+        return
+    
+    # Calculate days recommendation
+    if days_live > 0:
+        days_result = calculate_days_needed(required_total, total_current_visitors, days_live)
         
-        # Show detailed breakdown
-        with st.expander("📈 See detailed breakdown"):
-            st.markdown(f"""
-            **Current Status:**
-            - Days running: {days_live}
-            - Total visitors so far: {total_current_visitors:,}
-            - Average visitors per day: {total_current_visitors/days_live:.0f}
+        if days_result:
+            total_days_needed, additional_days = days_result
             
-            **Requirements:**
-            - Minimum detectable effect (MDE): {mde_percent}% relative lift
-            - Required visitors per variant: {required_sample_per_variant:,}
-            - Required total visitors: {required_total:,}
-            - Minimum recommended duration: 14 days
+            st.markdown("")  # spacing
             
-            **Projection:**
-            - Estimated total days needed: {max(total_days_needed, 14)} days
-            - Additional days recommended: {max(additional_days, 14 - days_live)} days
-            """)
-else:
-    st.info("💡 Enter the number of days this test has been running to get duration recommendations.")
+            # Recommendations
+            if total_current_visitors >= required_total and days_live >= MIN_TEST_DAYS:
+                st.success(f"✅ **Test is ready to conclude** — You've reached the required sample size ({required_total:,} visitors) and run for {days_live} days. You can confidently analyze results.")
+            elif total_current_visitors >= required_total and days_live < MIN_TEST_DAYS:
+                days_remaining = MIN_TEST_DAYS - days_live
+                st.warning(f"⚠️ **Sample size reached, but run longer** — You have enough visitors, but tests should run at least {MIN_TEST_DAYS} days to capture weekly patterns. Recommend running {days_remaining} more days.")
+            elif total_current_visitors < required_total and days_live >= MIN_TEST_DAYS:
+                st.warning(f"⚠️ **Need more sample size** — You've run for {days_live} days, but need approximately **{additional_days} more days** to reach {required_total:,} total visitors (based on current traffic of {total_current_visitors/days_live:.0f} visitors/day).")
+            else:
+                # Need both more time and more sample
+                days_for_sample = max(total_days_needed, MIN_TEST_DAYS)
+                days_remaining = days_for_sample - days_live
+                st.info(f"📊 **Continue testing** — Recommend running for approximately **{days_remaining} more days** to reach both minimum duration ({MIN_TEST_DAYS} days) and required sample size ({required_total:,} visitors).")
+            
+            # Show detailed breakdown
+            with st.expander("📈 See detailed breakdown"):
+                st.markdown(f"""
+                **Current Status:**
+                - Days running: {days_live}
+                - Total visitors so far: {total_current_visitors:,}
+                - Average visitors per day: {total_current_visitors/days_live:.0f}
+                
+                **Requirements:**
+                - Minimum detectable effect (MDE): {mde_percent}% relative lift
+                - Required visitors per variant: {required_sample_per_variant:,}
+                - Required total visitors: {required_total:,}
+                - Minimum recommended duration: {MIN_TEST_DAYS} days
+                
+                **Projection:**
+                - Estimated total days needed: {max(total_days_needed, MIN_TEST_DAYS)} days
+                - Additional days recommended: {max(additional_days, MIN_TEST_DAYS - days_live)} days
+                """)
+    else:
+        st.info("💡 Enter the number of days this test has been running to get duration recommendations.")
+
+sample_size_section(baseline_conv_rate, total_current_visitors)
+duration_advice_section(baseline_conv_rate, total_current_visitors)
+
+# Weekday-aware forecast from a daily series
+st.markdown("### 📅 Forecast from Daily Traffic")
+
+@st.fragment(key="daily_forecast")
+def daily_forecast_section(baseline_conv_rate, aov_A, sd_aov_A, arpu_A, sd_arpu_A):
+    """Seasonal forecast (depends on MDE and the uploaded daily series)"""
+    mde_percent = st.session_state["mde_percent"]
+    mde_decimal = mde_percent / 100
+    
+    daily_file = st.file_uploader(
+        "Daily traffic series (CSV)",
+        type="csv",
+        help="One row per day with columns date, visitors_A, visitors_B, conversions_A, conversions_B. Weekend and weekday traffic are modelled separately, so forecasts don't assume flat traffic.",
+        key="daily_file",
+        on_change=rerun_sections,
+        args=("sample_size", "duration_advice", "daily_forecast", "srm_daily")
+    )
+    
+    daily_series = None
+    if daily_file is not None:
+        try:
+            daily_series = load_daily_series(daily_file.getvalue())
+        except (ValueError, KeyError) as e:
+            st.error(f"⚠️ Error reading daily series: {e}")
+        else:
+            if daily_series.empty:
+                st.error("⚠️ The daily series has no rows.")
+                daily_series = None
+    
+    if daily_series is not None:
+        traffic_model = duration.fit_weekly_traffic(daily_series["date"], daily_series["visitors_A"] + daily_series["visitors_B"])
+        
+        # Baseline from the series itself when it has control conversions (and
+        # revenue), so requirements and traffic describe the same experiment
+        series_baseline = duration.series_baseline(daily_series)
+        baseline_source = "the manual inputs above"
+        if series_baseline["baseline_rate"] > 0:
+            baseline_conv_rate = series_baseline["baseline_rate"]
+            baseline_source = "the uploaded series (conversion rate), with order values from the manual inputs"
+            if series_baseline["aov"] is not None:
+                aov_A, sd_aov_A = series_baseline["aov"], series_baseline["sd_aov"]
+                arpu_A, sd_arpu_A = series_baseline["arpu"], series_baseline["sd_arpu"]
+                baseline_source = "the uploaded series"
+        
+        mde_grid = sorted({mde_percent, 5.0, 10.0, 15.0, 20.0, 25.0})
+        forecast = duration.forecast_table(
+            daily_series, traffic_model, baseline_conv_rate,
+            aov_A, sd_aov_A, arpu_A, sd_arpu_A,
+            [m / 100 for m in mde_grid]
+        )
+        
+        # Headline: conversion rate at the configured MDE
+        headline = forecast[(forecast["metric"] == "Conversion Rate") & (forecast["mde"] == mde_decimal)].iloc[0]
+        if headline["reachable"]:
+            st.info(f"📅 **Seasonal forecast** — At current weekday/weekend traffic, {headline['required_total']:,.0f} visitors ({mde_percent}% MDE) are reached after about {headline['days_needed']:.0f} days. Rounded up to full weeks, plan to end the test on **{headline['end_date']:%b %d, %Y}** ({headline['days_rounded']:.0f} days).")
+        else:
+            st.warning(f"⚠️ **Not reachable within a year** — At current traffic, the {mde_percent}% MDE needs more than 365 days. Consider a larger MDE.")
+        
+        forecast_display = forecast.assign(
+            cell=[
+                f"{row.end_date:%b %d} ({row.days_rounded:.0f}d)" if row.reachable else "> 1 year"
+                for row in forecast.itertuples()
+            ],
+            mde=forecast["mde"] * 100
+        ).pivot(index="mde", columns="metric", values="cell")[["Conversion Rate", "Revenue Per Visitor", "Average Order Value"]]
+        forecast_display.index = [f"{m:g}% MDE" for m in forecast_display.index]
+        st.dataframe(forecast_display, use_container_width=True)
+        st.caption(f"Test end date (and length) for each metric and MDE, rounded up to full weeks. Control baseline from {baseline_source}.")
+        
+        cumulative = duration.cumulative_series(daily_series)
+        forecast_dates, forecast_cumulative = duration.cumulative_forecast(daily_series, traffic_model, horizon_days=56)
+        
+        forecast_col1, forecast_col2 = st.columns(2)
+        with forecast_col1:
+            st.plotly_chart(
+                create_traffic_forecast_chart(cumulative, forecast_dates, forecast_cumulative, headline["required_total"]),
+                use_container_width=True
+            )
+        with forecast_col2:
+            st.plotly_chart(create_cumulative_rate_chart(cumulative), use_container_width=True)
+        
+        weekday_cols = st.columns(7)
+        for weekday_col, name, factor in zip(weekday_cols, duration.WEEKDAY_NAMES, traffic_model["weekday_factors"]):
+            with weekday_col:
+                st.metric(name, f"{factor * traffic_model['level']:,.0f}", delta=f"{(factor - 1) * 100:+.0f}% vs avg", delta_color="off")
+        st.caption("Expected visitors per weekday from the fitted weekly pattern.")
+    else:
+        st.caption("Upload a daily series for a weekday-aware forecast and cumulative charts.")
+
+daily_forecast_section(baseline_conv_rate, aov_A, sd_aov_A, arpu_A, sd_arpu_A)
 
 st.markdown("---")
 
@@ -536,12 +710,53 @@ with chart_col3:
 
 st.markdown("---")
 
+# Sample Ratio Mismatch check: a broken assignment pipeline invalidates every test below
+st.markdown("## 🚦 Sample Ratio Check")
+
+srm_chi2, srm_p_value, srm_failed = calculate_srm(n_A, n_B, variant_share_percent / 100)
+expected_B = (n_A + n_B) * variant_share_percent / 100
+
+srm_col1, srm_col2, srm_col3, srm_col4 = st.columns(4)
+
+with srm_col1:
+    st.metric("Expected Split", f"{100 - variant_share_percent:g} / {variant_share_percent:g}")
+with srm_col2:
+    st.metric("Observed Split", f"{n_A / (n_A + n_B) * 100:.1f} / {n_B / (n_A + n_B) * 100:.1f}")
+with srm_col3:
+    st.metric("Chi-Square", f"{srm_chi2:.2f}")
+with srm_col4:
+    st.metric("P-Value", f"{srm_p_value:.4f}")
+
+if srm_failed:
+    st.error(f"⛔ **Sample Ratio Mismatch** — The variant got {n_B:,} visitors where ~{expected_B:,.0f} were expected (p = {srm_p_value:.2e}). This usually means broken assignment or tracking, so the significance verdicts below are withheld. Fix the data before drawing conclusions.")
+else:
+    st.success(f"✅ **Traffic split looks healthy** — The observed split is consistent with the configured {100 - variant_share_percent:g}/{variant_share_percent:g} allocation.")
+
+@st.fragment(key="srm_daily")
+def srm_daily_section(variant_share):
+    """Day-by-day SRM screen (depends on the uploaded daily series)"""
+    daily_series = current_daily_series()
+    
+    if daily_series is not None:
+        # Same uploaded daily data as the duration forecast, screened day by day
+        srm_daily_results, _ = srm.screen_srm(daily_series.assign(experiment="current"), variant_share)
+        days_flagged = int(srm_daily_results["srm_day"].sum())
+        if days_flagged:
+            flagged_dates = ", ".join(f"{d:%b %d}" for d in srm_daily_results.loc[srm_daily_results["srm_day"], "date"])
+            st.warning(f"⚠️ **{days_flagged} day(s) with a mismatched split** in the daily series: {flagged_dates}. Check for deployments or tracking changes on those days.")
+        else:
+            st.caption(f"No single day in the uploaded series ({len(srm_daily_results)} days) shows a mismatched split.")
+
+srm_daily_section(variant_share_percent / 100)
+
+st.markdown("---")
+
 # Statistical Tests
 st.markdown("## 🔬 Statistical Significance Analysis")
 
 # Test 1: Conversion Rate
 st.markdown("### 1️⃣ Conversion Rate Test")
-z_stat_conv, p_value_conv = calculate_z_test_conversion(conv_rate_A, n_A, conv_rate_B, n_B)
+z_stat_conv, p_value_conv = results["z_stat_conv"], results["p_value_conv"]
 
 if z_stat_conv is not None:
     confidence_level_conv = (1 - p_value_conv) * 100
@@ -557,16 +772,20 @@ if z_stat_conv is not None:
     with test_col4:
         st.metric("Confidence", f"{confidence_level_conv:.2f}%")
     with test_col5:
-        if p_value_conv < 0.05:
+        if srm_failed:
+            st.metric("Result", "⛔ Withheld", delta="Sample ratio mismatch", delta_color="off")
+        elif p_value_conv < SIGNIFICANCE_LEVEL:
             st.metric("Result", "✅ Significant", delta="95%+ confidence")
         else:
             st.metric("Result", "❌ Inconclusive", delta="Need more data")
     
     st.markdown("")  # spacing
     
-    if p_value_conv < 0.05:
+    if srm_failed:
+        st.caption("Verdict withheld until the sample ratio mismatch is resolved.")
+    elif p_value_conv < SIGNIFICANCE_LEVEL:
         st.success(f"✅ **Statistically Significant** — {confidence_level_conv:.2f}% confidence this isn't random chance.")
-    elif p_value_conv < 0.10:
+    elif p_value_conv < MARGINAL_SIGNIFICANCE_LEVEL:
         st.warning(f"⚠️ **Marginally Significant** — {confidence_level_conv:.2f}% confidence. P-value of {p_value_conv:.4f} suggests a trend, but more data recommended.")
     else:
         st.error(f"❌ **Not Significant** — Only {confidence_level_conv:.2f}% confidence. P-value of {p_value_conv:.4f} means we can't rule out random chance. Continue testing.")
@@ -575,35 +794,66 @@ st.markdown("")  # spacing
 
 # Test 2: RPV/ARPU
 st.markdown("### 2️⃣ Revenue Per Visitor Test")
-t_stat_arpu, df_arpu, p_value_arpu = calculate_welch_t_test(arpu_A, sd_arpu_A, n_A, arpu_B, sd_arpu_B, n_B)
-
-if t_stat_arpu is not None:
-    confidence_level_arpu = (1 - p_value_arpu) * 100
+@st.fragment(key="rpv_test")
+def rpv_test_section(results, arpu_lift, srm_failed):
+    """RPV test; switching between tests reruns only this section"""
+    rpv_test = st.radio(
+        "Test",
+        ["Welch's t-test", "Mann-Whitney U", "Brunner-Munzel"],
+        horizontal=True,
+        help="Welch's t-test compares mean revenue and can be swayed by a few very large orders. The rank-based tests ask whether variant visitors tend to spend more, which is robust to heavy tails; Brunner-Munzel also allows the two arms to have differently shaped distributions.",
+        key="rpv_test",
+        on_change=rerun_sections,
+        args=("rpv_test",)
+    )
+    rank_test_key = {"Mann-Whitney U": "mw", "Brunner-Munzel": "bm"}.get(rpv_test)
     
-    test_col1, test_col2, test_col3, test_col4, test_col5 = st.columns(5)
+    if rank_test_key is not None and results[f"p_value_{rank_test_key}_arpu"] is not None:
+        stat_label_arpu = "Z-Score" if rank_test_key == "mw" else "W-Score"
+        t_stat_arpu = results["z_mw_arpu"] if rank_test_key == "mw" else results["w_bm_arpu"]
+        p_value_arpu = results[f"p_value_{rank_test_key}_arpu"]
+    else:
+        if rank_test_key is not None:
+            st.caption("Rank tests need an order value for every conversion (and a non-degenerate sample), so Welch's t-test is shown instead.")
+        stat_label_arpu = "T-Score"
+        t_stat_arpu, df_arpu, p_value_arpu = results["t_stat_arpu"], results["df_arpu"], results["p_value_arpu"]
     
-    with test_col1:
-        st.metric("Relative Lift", f"{arpu_lift:+.2f}%")
-    with test_col2:
-        st.metric("T-Score", f"{t_stat_arpu:.3f}")
-    with test_col3:
-        st.metric("P-Value", f"{p_value_arpu:.4f}")
-    with test_col4:
-        st.metric("Confidence", f"{confidence_level_arpu:.2f}%")
-    with test_col5:
-        if p_value_arpu < 0.05:
-            st.metric("Result", "✅ Significant", delta="95%+ confidence")
+    if t_stat_arpu is not None:
+        confidence_level_arpu = (1 - p_value_arpu) * 100
+        
+        test_col1, test_col2, test_col3, test_col4, test_col5 = st.columns(5)
+        
+        with test_col1:
+            st.metric("Relative Lift", f"{arpu_lift:+.2f}%")
+        with test_col2:
+            st.metric(stat_label_arpu, f"{t_stat_arpu:.3f}")
+        with test_col3:
+            st.metric("P-Value", f"{p_value_arpu:.4f}")
+        with test_col4:
+            st.metric("Confidence", f"{confidence_level_arpu:.2f}%")
+        with test_col5:
+            if srm_failed:
+                st.metric("Result", "⛔ Withheld", delta="Sample ratio mismatch", delta_color="off")
+            elif p_value_arpu < SIGNIFICANCE_LEVEL:
+                st.metric("Result", "✅ Significant", delta="95%+ confidence")
+            else:
+                st.metric("Result", "❌ Inconclusive", delta="Need more data")
+        
+        st.markdown("")  # spacing
+        
+        if srm_failed:
+            st.caption("Verdict withheld until the sample ratio mismatch is resolved.")
+        elif p_value_arpu < SIGNIFICANCE_LEVEL:
+            st.success(f"✅ **Statistically Significant** — {confidence_level_arpu:.2f}% confidence this isn't random chance.")
+        elif p_value_arpu < MARGINAL_SIGNIFICANCE_LEVEL:
+            st.warning(f"⚠️ **Marginally Significant** — {confidence_level_arpu:.2f}% confidence. P-value of {p_value_arpu:.4f} suggests a trend, but more data recommended.")
         else:
-            st.metric("Result", "❌ Inconclusive", delta="Need more data")
-    
-    st.markdown("")  # spacing
-    
-    if p_value_arpu < 0.05:
-        st.success(f"✅ **Statistically Significant** — {confidence_level_arpu:.2f}% confidence this isn't random chance.")
-    elif p_value_arpu < 0.10:
-        st.warning(f"⚠️ **Marginally Significant** — {confidence_level_arpu:.2f}% confidence. P-value of {p_value_arpu:.4f} suggests a trend, but more data recommended.")
-    else:
-        st.error(f"❌ **Not Significant** — Only {confidence_level_arpu:.2f}% confidence. P-value of {p_value_arpu:.4f} means we can't rule out random chance. Continue testing.")
+            st.error(f"❌ **Not Significant** — Only {confidence_level_arpu:.2f}% confidence. P-value of {p_value_arpu:.4f} means we can't rule out random chance. Continue testing.")
+        
+        if stat_label_arpu != "T-Score":
+            st.caption(f"A random variant visitor spends more than a random control visitor with probability {results['prob_superiority_arpu'] * 100:.2f}% (ties count half; 50% means no difference).")
+
+rpv_test_section(results, arpu_lift, srm_failed)
 
 st.markdown("")  # spacing
 
@@ -611,7 +861,7 @@ st.markdown("")  # spacing
 st.markdown("### 3️⃣ Average Order Value Test")
 
 if n_purchasers_A > 1 and n_purchasers_B > 1:
-    t_stat_aov, df_aov, p_value_aov = calculate_welch_t_test(aov_A, sd_aov_A, n_purchasers_A, aov_B, sd_aov_B, n_purchasers_B)
+    t_stat_aov, df_aov, p_value_aov = results["t_stat_aov"], results["df_aov"], results["p_value_aov"]
     
     if t_stat_aov is not None:
         confidence_level_aov = (1 - p_value_aov) * 100
@@ -627,22 +877,192 @@ if n_purchasers_A > 1 and n_purchasers_B > 1:
         with test_col4:
             st.metric("Confidence", f"{confidence_level_aov:.2f}%")
         with test_col5:
-            if p_value_aov < 0.05:
+            if srm_failed:
+                st.metric("Result", "⛔ Withheld", delta="Sample ratio mismatch", delta_color="off")
+            elif p_value_aov < SIGNIFICANCE_LEVEL:
                 st.metric("Result", "✅ Significant", delta="95%+ confidence")
             else:
                 st.metric("Result", "❌ Inconclusive", delta="Need more data")
         
         st.markdown("")  # spacing
         
-        if p_value_aov < 0.05:
+        if srm_failed:
+            st.caption("Verdict withheld until the sample ratio mismatch is resolved.")
+        elif p_value_aov < SIGNIFICANCE_LEVEL:
             st.success(f"✅ **Statistically Significant** — {confidence_level_aov:.2f}% confidence this isn't random chance.")
-        elif p_value_aov < 0.10:
+        elif p_value_aov < MARGINAL_SIGNIFICANCE_LEVEL:
             st.warning(f"⚠️ **Marginally Significant** — {confidence_level_aov:.2f}% confidence. P-value of {p_value_aov:.4f} suggests a trend, but more data recommended.")
         else:
             st.error(f"❌ **Not Significant** — Only {confidence_level_aov:.2f}% confidence. P-value of {p_value_aov:.4f} means we can't rule out random chance. Continue testing.")
+
+    # Quantile effects: did typical orders change, or only a few large ones?
+    # (from the order values entered; not available for exports)
+    quantile_results = None if export_stats is not None else run_cached("quantiles", quantiles.order_value_effects, {
+        "n_purchasers_A": n_purchasers_A,
+        "revenue_text_A": analysis_inputs["revenue_text_A"],
+        "n_purchasers_B": n_purchasers_B,
+        "revenue_text_B": analysis_inputs["revenue_text_B"],
+    })
+    
+    if quantile_results is not None and quantile_results["orders_A"] > 1 and quantile_results["orders_B"] > 1:
+        st.markdown("#### Order Value Distribution")
+        quantile_cols = st.columns(len(quantile_results["effects"]))
+        
+        for quantile_col, effect in zip(quantile_cols, quantile_results["effects"]):
+            with quantile_col:
+                label = "Median Order" if effect["quantile"] == 0.5 else f"P{effect['quantile'] * 100:.0f} Order"
+                # No relative difference when the control quantile is 0 (e.g. all orders at or below $0.01)
+                relative_difference = effect["relative_difference"]
+                st.metric(
+                    label,
+                    f"${effect['control']:.2f} → ${effect['variant']:.2f}",
+                    delta=f"{relative_difference:+.2f}%" if relative_difference is not None else "n/a",
+                    delta_color="normal" if effect["significant"] and not srm_failed and relative_difference is not None else "off",
+                    delta_arrow="auto" if relative_difference is not None else "off"
+                )
+                st.caption(f"95% CI: {effect['ci_low']:+.2f} to {effect['ci_high']:+.2f}")
+        
+        st.caption(
+            f"Bootstrap confidence intervals from {quantile_results['orders_A']:,} control and "
+            f"{quantile_results['orders_B']:,} variant order values entered. Shows whether the typical "
+            "order moved or only a few large orders did."
+        )
 else:
     st.warning("⚠️ Need at least 2 conversions in each group to test AOV significance.")
 
+# Inputs and results in the columnar export schema, for BI tools
+results_report = {
+    "experiment": os.path.splitext(os.path.basename(export_path))[0] if export_stats is not None else "calculator",
+    "inputs": {
+        "visitors_A": n_A,
+        "conversions_A": n_purchasers_A,
+        "visitors_B": n_B,
+        "conversions_B": n_purchasers_B,
+        "variant_share": variant_share_percent / 100,
+    },
+    "results": results,
+    "srm": {"chi2": srm_chi2, "p_value": srm_p_value, "mismatch": srm_failed},
+    "verdicts": metric_verdicts(results, srm_failed),
+}
+
+@st.fragment(key="results_download")
+def results_download_section(results_report):
+    """Results download (its required sample size depends on MDE)"""
+    mde_decimal = st.session_state["mde_percent"] / 100
+    
+    st.download_button(
+        "⬇️ Download results (Parquet)",
+        # Built only when clicked, outside the script run, so the MDE is bound here
+        data=lambda: export.table_bytes(export.report_table([results_report], mde_decimal)),
+        file_name=f"{results_report['experiment']}_results.parquet",
+        mime="application/vnd.apache.parquet",
+        on_click="ignore",
+        help="Sufficient statistics, lifts, test statistics, p-values, verdicts and required sample size in the same schema as export.py, for BI tools"
+    )
+
+results_download_section(results_report)
+
+st.markdown("---")
+
+# Segment Breakdown
+st.markdown("## 🧩 Segment Breakdown")
+
+@st.fragment(key="segments")
+def segment_section():
+    """Segment breakdown; its upload and selections rerun only this section"""
+    segment_file = st.file_uploader(
+        "Visitor-level data (CSV)",
+        type="csv",
+        help="One row per visitor with an arm column (control/variant or A/B), a revenue column (0 for visitors who didn't buy) and one or more segment columns such as device, country or channel."
+    )
+    
+    if segment_file is not None:
+        try:
+            segment_file_columns = segments.read_columns(segment_file)
+        except Exception:
+            st.error("⚠️ Error reading the uploaded file. Please check it is a valid CSV.")
+            segment_file_columns = []
+        
+        if segment_file_columns:
+            seg_col1, seg_col2, seg_col3, seg_col4 = st.columns(4)
+            
+            with seg_col1:
+                arm_col = st.selectbox(
+                    "Arm column",
+                    segment_file_columns,
+                    index=segment_file_columns.index("arm") if "arm" in segment_file_columns else 0
+                )
+            with seg_col2:
+                revenue_col = st.selectbox(
+                    "Revenue column",
+                    segment_file_columns,
+                    index=segment_file_columns.index("revenue") if "revenue" in segment_file_columns else 0
+                )
+            with seg_col3:
+                segment_col = st.selectbox(
+                    "Segment by",
+                    [c for c in segment_file_columns if c not in (arm_col, revenue_col)] or segment_file_columns
+                )
+            with seg_col4:
+                correction = st.selectbox(
+                    "Multiple comparison correction",
+                    ["holm", "bh", "bonferroni"],
+                    format_func={"holm": "Holm", "bh": "Benjamini-Hochberg (FDR)", "bonferroni": "Bonferroni"}.get,
+                    help="Testing many segments inflates false positives. Significance below uses adjusted p-values."
+                )
+            
+            try:
+                seg_stats = load_segment_stats(segment_file.getvalue(), segment_col, arm_col, revenue_col)
+            except ValueError as e:
+                st.error(f"⚠️ Error aggregating segments: {e}")
+                seg_stats = None
+            except KeyError:
+                st.error("⚠️ Error aggregating segments. Check the arm column contains control/variant (or A/B) labels and revenue is numeric.")
+                seg_stats = None
+            
+            if seg_stats is not None:
+                seg_results = segments.analyze_segments(seg_stats, correction)
+                
+                seg_table = seg_results[[
+                    "visitors_A", "visitors_B",
+                    "conv_rate_A", "conv_rate_B", "conv_lift", "p_adj_conv",
+                    "rpv_A", "rpv_B", "rpv_lift", "p_adj_rpv",
+                    "aov_A", "aov_B", "aov_lift", "p_adj_aov",
+                ]].rename(columns={
+                    "visitors_A": "Visitors (Control)", "visitors_B": "Visitors (Variant)",
+                    "conv_rate_A": "CR Control %", "conv_rate_B": "CR Variant %", "conv_lift": "CR Lift %", "p_adj_conv": "CR p (adj.)",
+                    "rpv_A": "RPV Control", "rpv_B": "RPV Variant", "rpv_lift": "RPV Lift %", "p_adj_rpv": "RPV p (adj.)",
+                    "aov_A": "AOV Control", "aov_B": "AOV Variant", "aov_lift": "AOV Lift %", "p_adj_aov": "AOV p (adj.)",
+                })
+                seg_table.index.name = segment_col
+                
+                st.dataframe(
+                    seg_table.style.format("{:.2f}").format("{:,}", subset=["Visitors (Control)", "Visitors (Variant)"])
+                    .format("{:.4f}", subset=["CR p (adj.)", "RPV p (adj.)", "AOV p (adj.)"])
+                    .highlight_between(left=0, right=0.05, inclusive="left", subset=["CR p (adj.)", "RPV p (adj.)", "AOV p (adj.)"], color="#dcfce7"),
+                    use_container_width=True
+                )
+                st.caption(f"{len(seg_table)} segments · highlighted p-values are significant after correction")
+                
+                # Interaction: does the lift differ between segments?
+                st.markdown("### Does the effect differ by segment?")
+                seg_interactions = segments.interaction_tests(seg_stats)
+                interaction_cols = st.columns(len(seg_interactions))
+                
+                for interaction_col, (metric_name, (q_stat, q_df, q_p)) in zip(interaction_cols, seg_interactions.items()):
+                    with interaction_col:
+                        st.metric(f"{metric_name} Interaction", f"p = {q_p:.4f}" if q_df > 0 else "n/a")
+                        st.caption(f"Cochran's Q = {q_stat:.2f} on {q_df:.0f} df")
+                
+                if any(q_df > 0 and q_p < 0.05 for _, q_df, q_p in seg_interactions.values()):
+                    st.warning("⚠️ **Effect varies by segment** — The lift is not consistent across segments. Review the table above before rolling out to everyone.")
+                else:
+                    st.success("✅ **Consistent effect** — No significant difference in lift between segments.")
+    else:
+        st.info("💡 Upload a visitor-level CSV to see whether the lift holds across devices, countries or channels.")
+
+segment_section()
+
 st.markdown("---")
 
 # Bottom Info
@@ -0,0 +1,231 @@
+"""
+Statistical calculators behind the CRO Test Calculator page.
+
+Kept free of Streamlit so batch jobs (simulation, reports) can import the
+same functions and decision thresholds the page uses.
+"""
+import math
+import statistics
+
+import rank_tests
+import stat_kernels
+
+# Decision rules shown on the page
+SIGNIFICANCE_LEVEL = 0.05
+MARGINAL_SIGNIFICANCE_LEVEL = 0.10
+MIN_TEST_DAYS = 14
+# Sample ratio mismatch is flagged at a much stricter level than the tests
+# themselves: a real SRM is usually extreme, and false alarms block verdicts
+SRM_SIGNIFICANCE_LEVEL = 0.001
+
+# Per-arm sufficient statistics used by batch inputs and exports
+ARM_STAT_COLUMNS = ["visitors", "conversions", "revenue_sum", "revenue_sumsq"]
+
+# Results of the rank-based RPV tests (need individual order values)
+RANK_TEST_KEYS = ["z_mw_arpu", "p_value_mw_arpu", "w_bm_arpu", "p_value_bm_arpu", "prob_superiority_arpu"]
+
+
+def calculate_welch_t_test(mean_A, sd_A, n_A, mean_B, sd_B, n_B):
+    """Welch's t-test for unequal variances"""
+    t_stat, df, p_value = stat_kernels.welch_t_test(mean_A, sd_A, n_A, mean_B, sd_B, n_B)
+    if math.isnan(t_stat):
+        return None, None, None
+    
+    return float(t_stat), float(df), float(p_value)
+
+
+def calculate_z_test_conversion(conv_A, n_A, conv_B, n_B):
+    """Z-test for conversion rate comparison"""
+    # Rates come in as percentages; the kernel works on conversion counts
+    z_stat, p_value = stat_kernels.z_test_proportions(conv_A / 100 * n_A, n_A, conv_B / 100 * n_B, n_B)
+    if math.isnan(z_stat):
+        return None, None
+    
+    return float(z_stat), float(p_value)
+
+
+def calculate_rank_tests(n_A, revenues_A, n_B, revenues_B):
+    """
+    Mann-Whitney U and Brunner-Munzel tests on revenue per visitor
+    revenues_*: purchaser revenues; the other visitors count as zeros
+    Returns a dict of z_mw_arpu, p_value_mw_arpu, w_bm_arpu, p_value_bm_arpu
+    and prob_superiority_arpu (P(variant visitor spends more)), None where undefined
+    """
+    zeros_A = max(0, n_A - len(revenues_A))
+    zeros_B = max(0, n_B - len(revenues_B))
+    _, z_mw, p_mw, prob_superiority = rank_tests.mann_whitney_u(zeros_A, revenues_A, zeros_B, revenues_B)
+    w_bm, p_bm, _ = rank_tests.brunner_munzel(zeros_A, revenues_A, zeros_B, revenues_B)
+    
+    return {
+        "z_mw_arpu": None if math.isnan(z_mw) else z_mw,
+        "p_value_mw_arpu": None if math.isnan(z_mw) else p_mw,
+        "w_bm_arpu": None if math.isnan(w_bm) else w_bm,
+        "p_value_bm_arpu": None if math.isnan(w_bm) else p_bm,
+        "prob_superiority_arpu": None if math.isnan(prob_superiority) else prob_superiority,
+    }
+
+
+def calculate_srm(n_A, n_B, variant_share=0.5):
+    """
+    Sample ratio mismatch check against the configured traffic split
+    variant_share: intended fraction of visitors in the variant (decimal)
+    Returns (chi2_stat, p_value, is_mismatch)
+    """
+    chi2_stat, p_value = stat_kernels.srm_test(n_A, n_B, variant_share)
+    if math.isnan(chi2_stat):
+        return None, None, False
+    
+    return float(chi2_stat), float(p_value), bool(p_value < SRM_SIGNIFICANCE_LEVEL)
+
+
+def calculate_sample_size_per_variant(baseline_rate, mde, alpha=0.05, power=0.80):
+    """
+    Calculate required sample size per variant for conversion rate tests
+    baseline_rate: baseline conversion rate (as decimal, e.g., 0.028 for 2.8%)
+    mde: minimum detectable effect (as decimal, e.g., 0.10 for 10% relative lift)
+    alpha: significance level (default 0.05 for 95% confidence)
+    power: statistical power (default 0.80)
+    Returns None where no sample size exists (baseline of 0% or 100%, MDE of 0)
+    """
+    n = stat_kernels.sample_size_proportions(baseline_rate, mde, alpha, power)
+    if not math.isfinite(n):
+        return None
+    
+    return math.ceil(n)
+
+
+def calculate_days_needed(required_visitors, current_visitors, days_elapsed):
+    """Calculate additional days needed based on current traffic rate"""
+    if days_elapsed <= 0:
+        return None
+    
+    visitors_per_day = current_visitors / days_elapsed
+    
+    if visitors_per_day <= 0:
+        return None
+    
+    days_needed = math.ceil(required_visitors / visitors_per_day)
+    additional_days = max(0, days_needed - days_elapsed)
+    
+    return days_needed, additional_days
+
+
+def parse_revenues(revenue_text, n_purchasers):
+    """
+    Parse a comma-separated revenue list into one value per purchaser
+    Extra values are dropped; missing ones are filled with the mean of the
+    values given (0 if none). Raises ValueError on non-numeric input.
+    """
+    revenues = [float(x.strip()) for x in revenue_text.split(',') if x.strip()][:n_purchasers]
+    
+    if len(revenues) < n_purchasers:
+        avg_rev = statistics.mean(revenues) if revenues else 0
+        revenues.extend([avg_rev] * (n_purchasers - len(revenues)))
+    
+    return revenues
+
+
+def analyze_experiment(n_A, n_purchasers_A, revenue_text_A, n_B, n_purchasers_B, revenue_text_B):
+    """
+    Parse inputs and compute every metric and test shown on the page
+    Returns a flat dict of plain numbers (None where a test can't run), so the
+    result can be cached and shared. Raises ValueError on unparseable revenue.
+    Rank tests are None when fewer order values than conversions are entered.
+    """
+    results = {}
+    revenues = {}
+    all_entered = True
+    
+    for arm, n, n_purchasers, revenue_text in (("A", n_A, n_purchasers_A, revenue_text_A),
+                                               ("B", n_B, n_purchasers_B, revenue_text_B)):
+        purchaser_revenues = parse_revenues(revenue_text, n_purchasers)
+        revenues[arm] = purchaser_revenues
+        all_entered = all_entered and sum(1 for x in revenue_text.split(',') if x.strip()) >= n_purchasers
+        n_zeros = max(0, n - n_purchasers)
+        
+        revenue_sum = math.fsum(purchaser_revenues)
+        aov = revenue_sum / len(purchaser_revenues) if purchaser_revenues else 0
+        # Squared deviations around each mean; visitors who didn't buy are
+        # zeros, so they contribute n_zeros * mean^2 without building the list
+        n_visitors = len(purchaser_revenues) + n_zeros
+        visitor_mean = revenue_sum / n_visitors if n_visitors > 0 else 0
+        ss_aov = math.fsum((x - aov) ** 2 for x in purchaser_revenues)
+        ss_arpu = math.fsum((x - visitor_mean) ** 2 for x in purchaser_revenues) + n_zeros * visitor_mean ** 2
+        
+        results[f"conv_rate_{arm}"] = (n_purchasers / n) * 100 if n > 0 else 0
+        results[f"aov_{arm}"] = aov
+        results[f"sd_aov_{arm}"] = math.sqrt(ss_aov / (len(purchaser_revenues) - 1)) if len(purchaser_revenues) > 1 else 0
+        results[f"arpu_{arm}"] = revenue_sum / n if n > 0 else 0
+        results[f"sd_arpu_{arm}"] = math.sqrt(ss_arpu / (n_visitors - 1)) if n > 1 else 0
+        results[f"revenue_sum_{arm}"] = revenue_sum
+        results[f"revenue_sumsq_{arm}"] = math.fsum(x * x for x in purchaser_revenues)
+    
+    # Mean-filled orders would be ranked as real (tied) values, so the rank
+    # tests only run when every conversion has an entered order value
+    if all_entered:
+        results.update(calculate_rank_tests(n_A, revenues["A"], n_B, revenues["B"]))
+    else:
+        results.update(dict.fromkeys(RANK_TEST_KEYS))
+    return _add_tests(results, n_A, n_purchasers_A, n_B, n_purchasers_B)
+
+
+def analyze_sufficient_stats(visitors_A, conversions_A, revenue_sum_A, revenue_sumsq_A,
+                             visitors_B, conversions_B, revenue_sum_B, revenue_sumsq_B):
+    """
+    Same results as analyze_experiment, from per-arm sufficient statistics
+    revenue_sum / revenue_sumsq: sum and sum of squares of order values
+    (visitors who didn't buy contribute zeros, so they are the same for
+    AOV and RPV). Used by batch jobs that never see individual orders.
+    Rank tests need the individual orders, so they come back as None.
+    """
+    results = dict.fromkeys(RANK_TEST_KEYS)
+    
+    for arm, n, n_purchasers, revenue_sum, revenue_sumsq in (
+        ("A", visitors_A, conversions_A, revenue_sum_A, revenue_sumsq_A),
+        ("B", visitors_B, conversions_B, revenue_sum_B, revenue_sumsq_B),
+    ):
+        aov, sd_aov = stat_kernels.mean_sd_from_sums(n_purchasers, revenue_sum, revenue_sumsq)
+        arpu, sd_arpu = stat_kernels.mean_sd_from_sums(n, revenue_sum, revenue_sumsq)
+        
+        results[f"conv_rate_{arm}"] = (n_purchasers / n) * 100 if n > 0 else 0
+        results[f"aov_{arm}"] = float(aov)
+        results[f"sd_aov_{arm}"] = float(sd_aov)
+        results[f"arpu_{arm}"] = float(arpu)
+        results[f"sd_arpu_{arm}"] = float(sd_arpu)
+        results[f"revenue_sum_{arm}"] = float(revenue_sum)
+        results[f"revenue_sumsq_{arm}"] = float(revenue_sumsq)
+    
+    return _add_tests(results, visitors_A, conversions_A, visitors_B, conversions_B)
+
+
+def relative_lift(control, variant):
+    """Relative lift of variant over control in percent (0 when control is 0)"""
+    return ((variant - control) / control * 100) if control > 0 else 0
+
+
+def _add_tests(results, n_A, n_purchasers_A, n_B, n_purchasers_B):
+    """Add lifts and the three significance tests to a metrics dict"""
+    for metric in ("conv", "aov", "arpu"):
+        metric_key = "conv_rate" if metric == "conv" else metric
+        results[f"{metric}_lift"] = relative_lift(results[f"{metric_key}_A"], results[f"{metric_key}_B"])
+    
+    results["z_stat_conv"], results["p_value_conv"] = calculate_z_test_conversion(
+        results["conv_rate_A"], n_A, results["conv_rate_B"], n_B
+    )
+    results["t_stat_arpu"], results["df_arpu"], results["p_value_arpu"] = calculate_welch_t_test(
+        results["arpu_A"], results["sd_arpu_A"], n_A, results["arpu_B"], results["sd_arpu_B"], n_B
+    )
+    results["t_stat_aov"], results["df_aov"], results["p_value_aov"] = calculate_welch_t_test(
+        results["aov_A"], results["sd_aov_A"], n_purchasers_A, results["aov_B"], results["sd_aov_B"], n_purchasers_B
+    )
+    
+    return results
+
+
+def significance_verdict(p_value):
+    """'significant', 'marginal' or 'not_significant' using the page's thresholds"""
+    if p_value < SIGNIFICANCE_LEVEL:
+        return "significant"
+    if p_value < MARGINAL_SIGNIFICANCE_LEVEL:
+        return "marginal"
+    return "not_significant"
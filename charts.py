@@ -0,0 +1,166 @@
+"""
+Plotly figure builders shared by the page and the batch report generator.
+"""
+import copy
+
+import plotly.graph_objects as go
+
+# Plotly JSON of each comparison chart, keyed by (metric_name, is_currency)
+_comparison_templates = {}
+
+
+def format_chart_value(value, is_currency=False):
+    """Bar label text: dollars for revenue metrics, percent otherwise"""
+    return f'${value:.2f}' if is_currency else f'{value:.2f}%'
+
+
+def create_comparison_chart(control_val, variant_val, metric_name, is_currency=False):
+    """Create a beautiful comparison bar chart"""
+    
+    fig = go.Figure()
+    
+    # Format text based on metric type
+    control_text = format_chart_value(control_val, is_currency)
+    variant_text = format_chart_value(variant_val, is_currency)
+    
+    fig.add_trace(go.Bar(
+        name='Control',
+        x=['Control'],
+        y=[control_val],
+        marker_color='#94a3b8',
+        text=[control_text],
+        textposition='outside',
+        textfont=dict(size=14, family='Inter', color='#1e293b'),
+        width=0.5
+    ))
+    
+    fig.add_trace(go.Bar(
+        name='Variant',
+        x=['Variant'],
+        y=[variant_val],
+        marker_color='#667eea',
+        text=[variant_text],
+        textposition='outside',
+        textfont=dict(size=14, family='Inter', color='#1e293b'),
+        width=0.5
+    ))
+    
+    # Calculate max value for proper y-axis range
+    max_val = max(control_val, variant_val)
+    
+    fig.update_layout(
+        title=dict(
+            text=metric_name, 
+            font=dict(size=16, family='Inter', color='#1e293b'),
+            x=0.5,
+            xanchor='center'
+        ),
+        showlegend=False,
+        paper_bgcolor='white',
+        plot_bgcolor='white',
+        height=300,
+        margin=dict(l=20, r=20, t=80, b=40),  # Increased top margin
+        yaxis=dict(
+            showgrid=True, 
+            gridcolor='#f1f5f9', 
+            zeroline=False,
+            title=None,
+            range=[0, max_val * 1.25]  # Add 25% padding above bars for labels
+        ),
+        xaxis=dict(
+            showgrid=False,
+            title=None
+        )
+    )
+    
+    return fig
+
+
+def comparison_chart_spec(control_val, variant_val, metric_name, is_currency=False):
+    """
+    Plotly JSON (dict) identical to create_comparison_chart(...).to_plotly_json()
+    The figure is built once per metric as a template; each call only fills in
+    the data-dependent fields, which skips Plotly's per-figure validation when
+    rendering hundreds of reports.
+    """
+    key = (metric_name, is_currency)
+    if key not in _comparison_templates:
+        _comparison_templates[key] = create_comparison_chart(0.0, 0.0, metric_name, is_currency).to_plotly_json()
+    
+    spec = copy.deepcopy(_comparison_templates[key])
+    for trace, value in zip(spec["data"], (control_val, variant_val)):
+        trace["y"] = [value]
+        trace["text"] = [format_chart_value(value, is_currency)]
+    spec["layout"]["yaxis"]["range"] = [0, max(control_val, variant_val) * 1.25]
+    
+    return spec
+
+
+def create_traffic_forecast_chart(cumulative, forecast_dates, forecast_cumulative, required_total):
+    """Cumulative visitors so far, the seasonal forecast and the required sample"""
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        name='Actual',
+        x=cumulative.index,
+        y=cumulative["visitors"],
+        mode='lines+markers',
+        line=dict(color='#667eea', width=3)
+    ))
+    
+    fig.add_trace(go.Scatter(
+        name='Forecast',
+        x=forecast_dates,
+        y=forecast_cumulative,
+        mode='lines',
+        line=dict(color='#667eea', width=2, dash='dot')
+    ))
+    
+    fig.add_hline(
+        y=required_total,
+        line=dict(color='#94a3b8', width=2, dash='dash'),
+        annotation_text=f"Required: {required_total:,.0f}",
+        annotation_position="top left"
+    )
+    
+    fig.update_layout(
+        title=dict(text="Cumulative Visitors", font=dict(size=16, family='Inter', color='#1e293b'), x=0.5, xanchor='center'),
+        showlegend=True,
+        legend=dict(orientation='h', y=-0.2),
+        paper_bgcolor='white',
+        plot_bgcolor='white',
+        height=340,
+        margin=dict(l=20, r=20, t=80, b=40),
+        yaxis=dict(showgrid=True, gridcolor='#f1f5f9', zeroline=False, title=None),
+        xaxis=dict(showgrid=False, title=None)
+    )
+    
+    return fig
+
+
+def create_cumulative_rate_chart(cumulative):
+    """Cumulative conversion rate per arm, day by day"""
+    fig = go.Figure()
+    
+    for arm, name, color in (("A", "Control", '#94a3b8'), ("B", "Variant", '#667eea')):
+        fig.add_trace(go.Scatter(
+            name=name,
+            x=cumulative.index,
+            y=cumulative[f"conv_rate_{arm}"],
+            mode='lines+markers',
+            line=dict(color=color, width=3)
+        ))
+    
+    fig.update_layout(
+        title=dict(text="Cumulative Conversion Rate", font=dict(size=16, family='Inter', color='#1e293b'), x=0.5, xanchor='center'),
+        showlegend=True,
+        legend=dict(orientation='h', y=-0.2),
+        paper_bgcolor='white',
+        plot_bgcolor='white',
+        height=340,
+        margin=dict(l=20, r=20, t=80, b=40),
+        yaxis=dict(showgrid=True, gridcolor='#f1f5f9', zeroline=False, title=None, ticksuffix='%'),
+        xaxis=dict(showgrid=False, title=None)
+    )
+    
+    return fig
@@ -0,0 +1,226 @@
+"""
+Memory-mapped columnar input for very large order-level exports.
+
+Per-arm sufficient statistics (visitors, conversions, revenue sum and sum of
+squares) are computed directly over memory-mapped columns, so a 100M-row
+export is never parsed or copied into Python objects. Only the pages of the
+columns actually used are read, and re-analysing the same file is served
+from the OS page cache.
+
+Supported inputs (one row per visitor, revenue 0 for visitors who didn't buy):
+    .npy                structured array with named fields (np.save of a record array)
+    directory           one <column>.npy file per column
+    .arrow/.feather     Arrow IPC file, mapped with pyarrow.memory_map (zero-copy
+                        when uncompressed)
+    .parquet            decoded one row group at a time with memory_map=True
+                        (Parquet is encoded, so this bounds memory rather than
+                        avoiding the decode)
+Arrow and Parquet need pyarrow.
+
+Usage:
+    python columnar.py orders.parquet checkout.arrow --out experiments.csv
+    python report.py orders.parquet checkout.arrow --out-dir reports/
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from calculations import ARM_STAT_COLUMNS
+from segments import ARM_LABELS
+
+COLUMNAR_EXTENSIONS = (".npy", ".arrow", ".feather", ".ipc", ".parquet")
+
+# Rows per batch; bounds temporaries (e.g. squared revenue) to ~64 MB each
+BATCH_ROWS = 1 << 23
+
+
+def is_columnar(path):
+    """Whether path is a file or directory this module can map"""
+    return os.path.isdir(path) or path.lower().endswith(COLUMNAR_EXTENSIONS)
+
+
+def resolve_export_path(root, path):
+    """
+    Real path of an export entered relative to root, or None if it resolves
+    outside root (absolute paths, .. segments and symlinks included)
+    """
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    return resolved if os.path.commonpath([root, resolved]) == root else None
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Reading Arrow or Parquet files requires pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def read_column_names(path):
+    """Column names of a columnar export without reading any rows"""
+    lower = path.lower()
+    if os.path.isdir(path):
+        return sorted(name[:-4] for name in os.listdir(path) if name.endswith(".npy"))
+    if lower.endswith(".npy"):
+        return list(np.load(path, mmap_mode="r").dtype.names or [])
+    pa = _pyarrow()
+    if lower.endswith(".parquet"):
+        return pa.parquet.read_schema(path, memory_map=True).names
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def iter_batches(path, columns):
+    """
+    Yield {column: array} batches of at most BATCH_ROWS rows
+    numpy inputs yield memmap views and Arrow IPC yields zero-copy slices of
+    the mapped buffers; Parquet yields decoded row groups.
+    """
+    lower = path.lower()
+    if os.path.isdir(path) or lower.endswith(".npy"):
+        if os.path.isdir(path):
+            mapped = {col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode="r") for col in columns}
+        else:
+            table = np.load(path, mmap_mode="r")
+            mapped = {col: table[col] for col in columns}
+
+        n_rows = len(next(iter(mapped.values()))) if mapped else 0
+        for start in range(0, n_rows, BATCH_ROWS):
+            yield {col: values[start:start + BATCH_ROWS] for col, values in mapped.items()}
+        return
+
+    pa = _pyarrow()
+    if lower.endswith(".parquet"):
+        parquet = pa.parquet.ParquetFile(path, memory_map=True)
+        for batch in parquet.iter_batches(batch_size=BATCH_ROWS, columns=list(columns)):
+            yield {col: batch.column(col) for col in columns}
+        return
+
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            record_batch = reader.get_batch(i)
+            for start in range(0, record_batch.num_rows, BATCH_ROWS):
+                batch = record_batch.slice(start, BATCH_ROWS)
+                yield {col: batch.column(col) for col in columns}
+
+
+def _to_numpy(values):
+    """numpy view of a column (zero-copy for numpy and null-free primitive Arrow arrays)"""
+    if isinstance(values, np.ndarray):
+        return values
+    return values.to_numpy(zero_copy_only=False)
+
+
+def _arm_codes(values):
+    """
+    Small integer code per row plus the label of each code
+    Arrow strings are dictionary-encoded and small non-negative integers are
+    used as codes directly, so only the distinct labels are ever normalized.
+    """
+    if not isinstance(values, np.ndarray):
+        pa = _pyarrow()
+        if pa.types.is_string(values.type) or pa.types.is_large_string(values.type):
+            values = pa.compute.dictionary_encode(values)
+        if pa.types.is_dictionary(values.type):
+            labels = values.dictionary.to_pylist() + [None]
+            indices = pa.compute.fill_null(values.indices, len(labels) - 1)
+            return indices.to_numpy(zero_copy_only=False), labels
+        values = _to_numpy(values)
+
+    if values.dtype.kind == "b":
+        values = values.view(np.uint8)
+    if values.dtype.kind in "iu" and values.size and values.min() >= 0 and values.max() < 256:
+        return values, list(range(int(values.max()) + 1))
+    if values.dtype.kind == "f" and values.size:
+        # Integer arms stored as floats (e.g. pandas writes an int column with
+        # NaNs as 0.0/1.0): integral values are labelled as ints, NaN as None
+        present = ~np.isnan(values)
+        arms = values[present]
+        if arms.size and arms.min() >= 0 and arms.max() < 256 and (arms == np.floor(arms)).all():
+            n_labels = int(arms.max()) + 1
+            return np.where(present, values, n_labels).astype(np.intp), list(range(n_labels)) + [None]
+
+    labels, codes = np.unique(values, return_inverse=True)
+    return codes, labels.tolist()
+
+
+def read_arm_stats(path, arm_col="arm", revenue_col="revenue", converted_col=None):
+    """
+    Per-arm sufficient statistics over a memory-mapped export
+    Arm labels are normalized like segment uploads (control/variant, A/B,
+    0/1); rows with other labels are ignored, and ValueError is raised when
+    no row has a known label. Conversions count rows with revenue > 0 unless
+    a boolean converted_col is given.
+    Returns {visitors_A, conversions_A, revenue_sum_A, revenue_sumsq_A, ..._B},
+    the keyword arguments of analyze_sufficient_stats
+    """
+    columns = [arm_col, revenue_col] + ([converted_col] if converted_col else [])
+    totals = {arm: np.zeros(len(ARM_STAT_COLUMNS)) for arm in ("A", "B")}
+
+    for batch in iter_batches(path, columns):
+        codes, labels = _arm_codes(batch[arm_col])
+        revenue = _to_numpy(batch[revenue_col]).astype(float, copy=False)
+        if np.isnan(revenue).any():
+            revenue = np.nan_to_num(revenue, nan=0.0)
+        converted = _to_numpy(batch[converted_col]).astype(bool) if converted_col else revenue > 0
+
+        # One pass per statistic, grouped by code; labels are mapped afterwards
+        n_codes = len(labels)
+        per_code = np.vstack([
+            np.bincount(codes, minlength=n_codes),
+            np.bincount(codes, weights=converted, minlength=n_codes),
+            np.bincount(codes, weights=revenue, minlength=n_codes),
+            np.bincount(codes, weights=revenue * revenue, minlength=n_codes),
+        ])
+
+        for code, label in enumerate(labels):
+            arm = ARM_LABELS.get(str(label).strip().lower()) if label is not None else None
+            if arm is not None:
+                totals[arm] += per_code[:, code]
+
+    if totals["A"][0] + totals["B"][0] == 0:
+        raise ValueError(f"No rows in '{arm_col}' have a known arm label (control/variant, A/B or 0/1)")
+
+    stats = {}
+    for arm, values in totals.items():
+        for stat, value in zip(ARM_STAT_COLUMNS, values):
+            stats[f"{stat}_{arm}"] = int(value) if stat in ("visitors", "conversions") else float(value)
+    return stats
+
+
+def read_experiments(paths, arm_col="arm", revenue_col="revenue", converted_col=None):
+    """One row of sufficient statistics per export, named after the file"""
+    rows = []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+        try:
+            stats = read_arm_stats(path, arm_col, revenue_col, converted_col)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from e
+        rows.append({"experiment": name, **stats})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-arm sufficient statistics from memory-mapped order exports")
+    parser.add_argument("paths", nargs="+", help=".npy, Arrow IPC or Parquet exports (one experiment each)")
+    parser.add_argument("--arm-col", default="arm")
+    parser.add_argument("--revenue-col", default="revenue")
+    parser.add_argument("--converted-col", default=None)
+    parser.add_argument("--out", default="experiments.csv", help="CSV in the format report.py reads")
+    args = parser.parse_args()
+
+    experiments = read_experiments(args.paths, args.arm_col, args.revenue_col, args.converted_col)
+    experiments.to_csv(args.out, index=False)
+    print(f"Wrote sufficient statistics for {len(experiments)} experiments to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
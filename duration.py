@@ -0,0 +1,203 @@
+"""
+Day-of-week-aware test duration forecasting from a daily traffic series.
+
+Traffic is modelled as a deseasonalized daily level times a weekday factor
+(weekend traffic can be 40% higher than midweek). The cumulative forecast is
+compared against the required sample size for every metric and MDE at once,
+and the resulting test length is rounded up to whole weeks so every weekday
+is equally represented.
+
+Daily series CSV columns (one row per day):
+    date, visitors_A, visitors_B, conversions_A, conversions_B
+optionally followed by revenue_sum_A, revenue_sum_B, revenue_sumsq_A, revenue_sumsq_B.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+import stat_kernels
+from calculations import MIN_TEST_DAYS
+
+DAILY_COLUMNS = ["date", "visitors_A", "visitors_B", "conversions_A", "conversions_B"]
+OPTIONAL_DAILY_COLUMNS = ["revenue_sum_A", "revenue_sum_B", "revenue_sumsq_A", "revenue_sumsq_B"]
+
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def read_daily_series(source):
+    """
+    Load and validate a daily series CSV
+    Days are sorted and duplicate dates summed. Raises ValueError if required
+    columns are missing.
+    """
+    daily = pd.read_csv(source)
+    missing = [col for col in DAILY_COLUMNS if col not in daily.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    columns = DAILY_COLUMNS + [col for col in OPTIONAL_DAILY_COLUMNS if col in daily.columns]
+    daily = daily[columns].copy()
+    daily["date"] = pd.to_datetime(daily["date"]).dt.normalize()
+    return daily.groupby("date", as_index=False).sum().sort_values("date").reset_index(drop=True)
+
+
+def fit_weekly_traffic(dates, visitors, recent_days=14):
+    """
+    Fit visitors_t = level * weekday_factor[weekday(t)]
+    Weekday factors are each weekday's mean traffic relative to the overall
+    mean (1.0 for weekdays not observed yet), normalized to average 1. The
+    level is the deseasonalized average of the last recent_days days, so it
+    follows recent growth or decline.
+    Returns {"level": float, "weekday_factors": array of 7 (Mon..Sun)}
+    """
+    weekdays = pd.DatetimeIndex(dates).weekday.to_numpy()
+    visitors = np.asarray(visitors, dtype=float)
+
+    sums = np.bincount(weekdays, visitors, minlength=7)
+    counts = np.bincount(weekdays, minlength=7)
+    factors = np.ones(7)
+
+    # Only trust weekday effects once every weekday has been seen
+    if visitors.mean() > 0 and (counts > 0).all():
+        factors = (sums / counts) / visitors.mean()
+        factors = factors / factors.mean()
+
+    recent = slice(-recent_days, None)
+    level = visitors[recent].sum() / factors[weekdays[recent]].sum()
+    return {"level": float(level), "weekday_factors": factors}
+
+
+def forecast_visitors(model, start_date, horizon_days):
+    """Forecast daily visitors for horizon_days starting at start_date"""
+    weekdays = pd.date_range(start_date, periods=horizon_days, freq="D").weekday.to_numpy()
+    return model["level"] * model["weekday_factors"][weekdays]
+
+
+def series_days(daily):
+    """Calendar days covered by a daily series, so missing days still count as elapsed"""
+    return (daily["date"].iloc[-1] - daily["date"].iloc[0]).days + 1
+
+
+def series_baseline(daily):
+    """
+    Control-arm baseline from a daily series, so the required sample size is
+    based on the same traffic the forecast extrapolates
+    Returns {baseline_rate, aov, sd_aov, arpu, sd_arpu}; the revenue entries
+    are None when the series has no revenue sums
+    """
+    visitors = float(daily["visitors_A"].sum())
+    conversions = float(daily["conversions_A"].sum())
+    baseline = {
+        "baseline_rate": conversions / visitors if visitors > 0 else 0.0,
+        "aov": None, "sd_aov": None, "arpu": None, "sd_arpu": None,
+    }
+
+    if "revenue_sum_A" in daily.columns and "revenue_sumsq_A" in daily.columns:
+        revenue_sum = float(daily["revenue_sum_A"].sum())
+        revenue_sumsq = float(daily["revenue_sumsq_A"].sum())
+        aov, sd_aov = stat_kernels.mean_sd_from_sums(conversions, revenue_sum, revenue_sumsq)
+        arpu, sd_arpu = stat_kernels.mean_sd_from_sums(visitors, revenue_sum, revenue_sumsq)
+        baseline.update(aov=float(aov), sd_aov=float(sd_aov), arpu=float(arpu), sd_arpu=float(sd_arpu))
+    return baseline
+
+
+def required_total_visitors(baseline_rate, aov, sd_aov, arpu, sd_arpu, mdes, alpha=0.05, power=0.80):
+    """
+    Total visitors (both arms) needed per metric for each MDE
+    AOV is tested on purchasers only, so its requirement is converted to
+    visitors through the baseline conversion rate.
+    Returns {metric: array of len(mdes)}; inf where a metric can't be powered
+    """
+    mdes = np.asarray(mdes, dtype=float)
+    conversion = stat_kernels.sample_size_proportions(baseline_rate, mdes, alpha, power)
+    rpv = stat_kernels.sample_size_means(arpu, sd_arpu, mdes, alpha, power)
+    aov_purchasers = stat_kernels.sample_size_means(aov, sd_aov, mdes, alpha, power)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        aov_visitors = aov_purchasers / baseline_rate if baseline_rate > 0 else np.full_like(mdes, np.inf)
+
+    per_variant = {
+        "Conversion Rate": conversion,
+        "Revenue Per Visitor": rpv,
+        "Average Order Value": aov_visitors,
+    }
+    return {
+        metric: np.where(np.isfinite(n) & (n > 0), 2 * np.ceil(np.nan_to_num(n, nan=np.inf, posinf=np.inf)), np.inf)
+        for metric, n in per_variant.items()
+    }
+
+
+def forecast_completion(daily, model, required_totals, horizon_days=365):
+    """
+    When each required sample is reached under the weekly-seasonal forecast
+    daily: series from read_daily_series (days observed so far)
+    required_totals: array (any shape) of required total visitors
+    Returns dict of arrays shaped like required_totals:
+        days_needed    test days until the sample is reached (NaN beyond horizon)
+        days_rounded   days_needed rounded up to whole weeks, at least MIN_TEST_DAYS
+        end_date       date the rounded test would end (NaT beyond horizon)
+    """
+    required_totals = np.asarray(required_totals, dtype=float)
+    days_elapsed = series_days(daily)
+    current_total = float((daily["visitors_A"] + daily["visitors_B"]).sum())
+
+    start = daily["date"].iloc[0]
+    next_day = daily["date"].iloc[-1] + pd.Timedelta(days=1)
+    cumulative = np.cumsum(forecast_visitors(model, next_day, horizon_days))
+
+    remaining = required_totals - current_total
+    # First forecast day whose cumulative traffic covers what's still missing
+    extra_days = np.searchsorted(cumulative, remaining, side="left") + 1.0
+    extra_days = np.where(remaining <= 0, 0.0, extra_days)
+    extra_days = np.where(np.isfinite(remaining) & (extra_days <= horizon_days), extra_days, np.nan)
+
+    days_needed = days_elapsed + extra_days
+    min_days = math.ceil(MIN_TEST_DAYS / 7) * 7
+    days_rounded = np.maximum(np.ceil(days_needed / 7) * 7, min_days)
+
+    end_date = np.full(required_totals.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+    reached = ~np.isnan(days_rounded)
+    end_date[reached] = np.datetime64(start.date()) + (days_rounded[reached] - 1).astype("timedelta64[D]")
+
+    return {"days_needed": days_needed, "days_rounded": days_rounded, "end_date": end_date}
+
+
+def cumulative_forecast(daily, model, horizon_days=56):
+    """Dates after the last observed day and forecast cumulative visitors on them"""
+    next_day = daily["date"].iloc[-1] + pd.Timedelta(days=1)
+    dates = pd.date_range(next_day, periods=horizon_days, freq="D")
+    current_total = float((daily["visitors_A"] + daily["visitors_B"]).sum())
+    return dates, current_total + np.cumsum(forecast_visitors(model, next_day, horizon_days))
+
+
+def cumulative_series(daily):
+    """Cumulative visitors and conversion rates per arm, day by day"""
+    cumulative = daily.set_index("date").cumsum()
+    out = pd.DataFrame(index=cumulative.index)
+    out["visitors"] = cumulative["visitors_A"] + cumulative["visitors_B"]
+    for arm in ("A", "B"):
+        out[f"conv_rate_{arm}"] = cumulative[f"conversions_{arm}"] / cumulative[f"visitors_{arm}"] * 100
+    return out
+
+
+def forecast_table(daily, model, baseline_rate, aov, sd_aov, arpu, sd_arpu, mdes, alpha=0.05, power=0.80):
+    """
+    Vectorized sweep over every metric and MDE
+    Returns a long DataFrame: metric, mde, required_total, days_needed,
+    days_rounded, end_date, reachable (False beyond the forecast horizon)
+    """
+    required = required_total_visitors(baseline_rate, aov, sd_aov, arpu, sd_arpu, mdes, alpha, power)
+    metrics = list(required)
+    grid = np.vstack([required[metric] for metric in metrics])
+    completion = forecast_completion(daily, model, grid)
+
+    return pd.DataFrame({
+        "metric": np.repeat(metrics, len(mdes)),
+        "mde": np.tile(np.asarray(mdes, dtype=float), len(metrics)),
+        "required_total": grid.ravel(),
+        "days_needed": completion["days_needed"].ravel(),
+        "days_rounded": completion["days_rounded"].ravel(),
+        "end_date": completion["end_date"].ravel(),
+        "reachable": ~np.isnan(completion["days_rounded"].ravel()),
+    })
@@ -0,0 +1,171 @@
+"""
+Columnar export of sufficient statistics and test results.
+
+Writes one row per experiment with both arms' sufficient statistics (visitors,
+conversions, revenue sum and sum of squares), the derived metrics, lifts,
+every test statistic and p-value, the SRM check, the verdicts and the
+required sample size. The schema is fixed (EXPORT_SCHEMA): every column is
+always present, with nulls where a test can't run, so exports from different
+runs concatenate and BI jobs can aggregate thousands of experiments without
+calling back into the calculator.
+
+Formats, by extension:
+    .arrow/.feather/.ipc  Arrow IPC file, uncompressed so readers can
+                          memory-map it zero-copy (pyarrow.memory_map)
+    .parquet              Parquet, compressed, for warehouses and long-term storage
+
+Input is the same as report.py: a CSV with one row of sufficient statistics
+per experiment, or one order-level export per experiment (see columnar.py).
+
+Usage:
+    python export.py experiments.csv --out results.parquet
+    python export.py exports/*.arrow --out results.arrow --mde 0.05
+"""
+import argparse
+import math
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet
+
+import columnar
+from calculations import RANK_TEST_KEYS, calculate_sample_size_per_variant
+from report import INPUT_COLUMNS, METRICS, build_report
+
+# Bump when columns are renamed, removed or change meaning (adding columns is compatible)
+EXPORT_SCHEMA_VERSION = 1
+
+IPC_EXTENSIONS = (".arrow", ".feather", ".ipc")
+
+ARM_FIELDS = [
+    ("visitors", pa.int64()),
+    ("conversions", pa.int64()),
+    ("revenue_sum", pa.float64()),
+    ("revenue_sumsq", pa.float64()),
+    ("conv_rate", pa.float64()),
+    ("aov", pa.float64()),
+    ("sd_aov", pa.float64()),
+    ("arpu", pa.float64()),
+    ("sd_arpu", pa.float64()),
+]
+
+TEST_FIELDS = [
+    "conv_lift", "arpu_lift", "aov_lift",
+    "z_stat_conv", "p_value_conv",
+    "t_stat_arpu", "df_arpu", "p_value_arpu",
+    "t_stat_aov", "df_aov", "p_value_aov",
+] + RANK_TEST_KEYS
+
+EXPORT_SCHEMA = pa.schema(
+    [pa.field("experiment", pa.string(), nullable=False), ("variant_share", pa.float64())]
+    + [(f"{stat}_{arm}", dtype) for arm in ("A", "B") for stat, dtype in ARM_FIELDS]
+    + [(field, pa.float64()) for field in TEST_FIELDS]
+    + [("srm_chi2", pa.float64()), ("srm_p_value", pa.float64()), ("srm_mismatch", pa.bool_())]
+    + [(f"verdict_{key}", pa.string()) for key, _, _, _ in METRICS]
+    + [("mde", pa.float64()), ("required_sample_per_variant", pa.int64()), ("required_total", pa.int64())],
+    metadata={"cro_export_schema_version": str(EXPORT_SCHEMA_VERSION)},
+)
+
+
+def _number(value):
+    """Float, or None for missing/undefined values"""
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def export_row(report, mde=0.10):
+    """
+    One EXPORT_SCHEMA row from a report (the dict report.build_report returns)
+    The required sample size uses the control conversion rate as baseline,
+    as on the page; None when the rate is 0 or 100%.
+    """
+    inputs, results, srm = report["inputs"], report["results"], report["srm"]
+    row = {"experiment": report["experiment"], "variant_share": _number(inputs.get("variant_share"))}
+
+    for arm in ("A", "B"):
+        for stat, dtype in ARM_FIELDS:
+            key = f"{stat}_{arm}"
+            value = _number(inputs[key] if key in inputs else results[key])
+            row[key] = int(round(value)) if dtype == pa.int64() and value is not None else value
+
+    for field in TEST_FIELDS:
+        row[field] = _number(results.get(field))
+
+    row["srm_chi2"] = _number(srm["chi2"])
+    row["srm_p_value"] = _number(srm["p_value"])
+    row["srm_mismatch"] = bool(srm["mismatch"])
+    for key, _, _, _ in METRICS:
+        row[f"verdict_{key}"] = report["verdicts"][key]
+
+    baseline_rate = results["conv_rate_A"] / 100
+    required = calculate_sample_size_per_variant(baseline_rate, mde)
+    row["mde"] = float(mde)
+    row["required_sample_per_variant"] = required
+    row["required_total"] = None if required is None else required * 2
+    return row
+
+
+def results_table(experiments, mde=0.10):
+    """
+    Arrow table with EXPORT_SCHEMA for experiments in the report.py input format
+    experiments: DataFrame with INPUT_COLUMNS (and optionally variant_share)
+    """
+    missing = [col for col in INPUT_COLUMNS if col not in experiments.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    return report_table([build_report(row) for row in experiments.to_dict("records")], mde)
+
+
+def report_table(reports, mde=0.10):
+    """Arrow table with EXPORT_SCHEMA from report dicts (see export_row)"""
+    return pa.Table.from_pylist([export_row(report, mde) for report in reports], schema=EXPORT_SCHEMA)
+
+
+def table_bytes(table, fmt="parquet"):
+    """Serialized table ("parquet" or "arrow"), e.g. for a download"""
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        pa.parquet.write_table(table, sink)
+    else:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def write_table(table, path):
+    """Write an export as Arrow IPC or Parquet, chosen by the file extension"""
+    lower = path.lower()
+    if lower.endswith(".parquet"):
+        pa.parquet.write_table(table, path)
+    elif lower.endswith(IPC_EXTENSIONS):
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unsupported export format: {path} (use .parquet, .arrow, .feather or .ipc)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export sufficient statistics and test results as Arrow/Parquet")
+    parser.add_argument("experiments", nargs="+",
+                        help="CSV with one row of sufficient statistics per experiment, or one order-level export per experiment")
+    parser.add_argument("--arm-col", default="arm", help="Arm column of order-level exports")
+    parser.add_argument("--revenue-col", default="revenue", help="Revenue column of order-level exports")
+    parser.add_argument("--mde", type=float, default=0.10, help="MDE (decimal) for the required sample size")
+    parser.add_argument("--out", default="results.parquet", help=".parquet, or .arrow/.feather for zero-copy readers")
+    args = parser.parse_args()
+
+    if len(args.experiments) == 1 and not columnar.is_columnar(args.experiments[0]):
+        experiments = pd.read_csv(args.experiments[0])
+    else:
+        experiments = columnar.read_experiments(args.experiments, args.arm_col, args.revenue_col)
+    table = results_table(experiments, args.mde)
+    write_table(table, args.out)
+    print(f"Wrote {table.num_rows} experiments to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
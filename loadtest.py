@@ -0,0 +1,294 @@
+"""
+Concurrent-session load test for the calculator page.
+
+Simulates analysts using the page at the same time with Streamlit's headless
+AppTest runner. Each session pastes comma-separated order values for both
+arms (sized from --visitors and --conv-rate), then keeps changing inputs:
+new pastes, visitor counts, days live, MDE and the RPV test. Reports rerun
+latency percentiles per action and resident memory: what each open session
+holds and the transient peak of a rerun.
+
+AppTest runs one script at a time per process, so concurrency comes from
+worker processes: each hosts a share of the sessions and cycles through
+them, and all workers start rerunning together. Memory is read from /proc
+(Linux only) after a warm-up session has loaded the page's imports, so the
+growth is what each additional session costs a server.
+
+AppTest only keeps the deltas of a section-only rerun, so before a section-
+only rerun is followed by a change elsewhere the page is refreshed with a
+full rerun without changes. These are reported as "refresh".
+
+Usage:
+    python loadtest.py --sessions 12 --workers 12 --visitors 1000000 --reruns 20 --out loadtest.csv
+"""
+import argparse
+import csv
+import gc
+import logging
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+
+import numpy as np
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "arpu_calc.py")
+ACTIONS = ("paste", "visitors", "days_live", "mde", "rpv_test")
+PERCENTILES = (50, 90, 95, 99)
+RPV_TESTS = ["Welch's t-test", "Mann-Whitney U", "Brunner-Munzel"]
+
+
+def _proc_status_bytes(field):
+    """A memory field of /proc/self/status (e.g. VmRSS, VmHWM) in bytes"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    raise OSError(f"{field} not found in /proc/self/status")
+
+
+def rss_bytes():
+    """Current resident set size of this process"""
+    gc.collect()
+    return _proc_status_bytes("VmRSS")
+
+
+def reset_peak_rss():
+    """Restart the resident set high-water mark (VmHWM) from the current RSS"""
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+
+
+def _share_script_cache():
+    """
+    Compile the page once per process like the server does; AppTest otherwise
+    recompiles it on every run, which would dominate short reruns
+    """
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    shared_script_cache = app_test.ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: shared_script_cache
+
+
+def order_values_text(rng, n_orders, aov, revenue_sigma):
+    """Comma-separated log-normal order values with mean aov, as pasted into the page"""
+    # E[X] = exp(mu + sigma^2 / 2)
+    mu = math.log(aov) - revenue_sigma ** 2 / 2
+    return ", ".join(f"{x:.2f}" for x in rng.lognormal(mu, revenue_sigma, n_orders))
+
+
+def _timed_run(at, timeout):
+    """Rerun the page; returns (wall seconds, CPU seconds of this process)"""
+    wall, cpu = time.perf_counter(), time.process_time()
+    at.run(timeout=timeout)
+    return time.perf_counter() - wall, time.process_time() - cpu
+
+
+def _paste(at, rng, params):
+    """New order values (and conversion counts) for both arms"""
+    for arm, lift in (("control", 0.0), ("variant", params["lift"])):
+        n_orders = rng.binomial(params["visitors"], params["conv_rate"] * (1 + lift))
+        at.number_input(key=f"{arm}_visitors").set_value(params["visitors"])
+        at.number_input(key=f"{arm}_conversions").set_value(int(n_orders))
+        at.text_area(key=f"{arm}_revenue").set_value(
+            order_values_text(rng, n_orders, params["aov"], params["revenue_sigma"])
+        )
+
+
+def _change_visitors(at, rng, params):
+    widget = at.number_input(key="control_visitors")
+    widget.set_value(widget.value + int(rng.integers(1, 100)))
+
+
+def _change_days_live(at, rng, params):
+    widget = at.number_input(key="days_live")
+    widget.set_value(int(rng.choice([d for d in range(7, 29) if d != widget.value])))
+
+
+def _change_mde(at, rng, params):
+    widget = at.number_input(key="mde_percent")
+    widget.set_value(float(rng.choice([m for m in (5.0, 10.0, 15.0, 20.0) if m != widget.value])))
+
+
+def _change_rpv_test(at, rng, params):
+    widget = at.radio(key="rpv_test")
+    widget.set_value(RPV_TESTS[(RPV_TESTS.index(widget.value) + 1) % len(RPV_TESTS)])
+
+
+CHANGES = {
+    "paste": _paste,
+    "visitors": _change_visitors,
+    "days_live": _change_days_live,
+    "mde": _change_mde,
+    "rpv_test": _change_rpv_test,
+}
+# Actions whose widget callbacks rerun only their own page section
+SECTION_ACTIONS = {"days_live", "mde", "rpv_test"}
+
+
+def _run_worker(task):
+    """Open this worker's sessions, then rerun them in turn; returns samples and memory readings"""
+    worker, n_sessions, seed, params, barrier = task
+    logging.disable(logging.WARNING)  # AppTest warns about the missing server runtime on every run
+    from streamlit.testing.v1 import AppTest
+
+    _share_script_cache()
+    rng = np.random.default_rng(seed)
+    timeout = params["timeout"]
+    samples = []
+
+    def open_session():
+        at = AppTest.from_file(params["script"], default_timeout=timeout).run()
+        _paste(at, rng, params)
+        return at, _timed_run(at, timeout)
+
+    # Warm-up: imports, cached resources and bytecode are paid once per process.
+    # The session stays open so later sessions can't reuse the memory it frees.
+    warm_up, _ = open_session()
+    baseline = rss_bytes()
+
+    sessions = []
+    last_action = []
+    for session in range(n_sessions):
+        at, (wall, cpu) = open_session()
+        sessions.append(at)
+        last_action.append("paste")
+        samples.append((worker, session, 0, "open", wall, cpu, len(at.exception)))
+    opened = rss_bytes()
+
+    barrier.wait()
+    reset_peak_rss()
+    for rerun in range(1, params["reruns"] + 1):
+        for session, at in enumerate(sessions):
+            # Stagger actions so sessions are doing different things at once
+            action = params["actions"][(rerun + session) % len(params["actions"])]
+            if last_action[session] in SECTION_ACTIONS and action != last_action[session]:
+                wall, cpu = _timed_run(at, timeout)
+                samples.append((worker, session, rerun, "refresh", wall, cpu, len(at.exception)))
+            CHANGES[action](at, rng, params)
+            wall, cpu = _timed_run(at, timeout)
+            samples.append((worker, session, rerun, action, wall, cpu, len(at.exception)))
+            last_action[session] = action
+
+    return {
+        "worker": worker,
+        "sessions": n_sessions,
+        "samples": samples,
+        "baseline_rss": baseline,
+        "opened_rss": opened,
+        "peak_rss": _proc_status_bytes("VmHWM"),
+        "final_rss": rss_bytes(),
+    }
+
+
+def run_load_test(sessions=12, workers=None, reruns=10, visitors=100_000, conv_rate=0.028, lift=0.05,
+                  aov=95.0, revenue_sigma=1.0, actions=ACTIONS, seed=0, script=SCRIPT_PATH, timeout=300):
+    """
+    Run the load test; sessions are spread as evenly as possible over the workers
+    Returns one result dict per worker (samples plus RSS readings in bytes)
+    """
+    workers = min(workers or os.cpu_count(), sessions)
+    params = {
+        "visitors": visitors, "conv_rate": conv_rate, "lift": lift, "aov": aov,
+        "revenue_sigma": revenue_sigma, "reruns": reruns, "actions": list(actions),
+        "script": script, "timeout": timeout,
+    }
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    per_worker = [sessions // workers + (w < sessions % workers) for w in range(workers)]
+
+    with Manager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+        barrier = manager.Barrier(workers)
+        tasks = [(w, per_worker[w], seeds[w], params, barrier) for w in range(workers)]
+        return list(executor.map(_run_worker, tasks))
+
+
+def latency_summary(results):
+    """Per-action latency percentiles in milliseconds (wall clock, plus median CPU)"""
+    samples = [sample for result in results for sample in result["samples"]]
+    rows = []
+    for action in ("open", "refresh") + ACTIONS:
+        wall = np.array([s[4] for s in samples if s[3] == action]) * 1000
+        if not len(wall):
+            continue
+        cpu = np.array([s[5] for s in samples if s[3] == action]) * 1000
+        row = {"action": action, "reruns": len(wall)}
+        row.update({f"p{p}_ms": float(np.percentile(wall, p)) for p in PERCENTILES})
+        row["max_ms"] = float(wall.max())
+        row["cpu_p50_ms"] = float(np.median(cpu))
+        row["errors"] = sum(s[6] for s in samples if s[3] == action)
+        rows.append(row)
+    return rows
+
+
+def memory_summary(results):
+    """
+    RSS in MB: baseline per process, held per open session, and the transient
+    peak of a rerun above the open sessions (medians/maxima over workers)
+    """
+    mb = 2 ** 20
+    per_session = [(r["opened_rss"] - r["baseline_rss"]) / r["sessions"] / mb for r in results]
+    transient = [(r["peak_rss"] - r["opened_rss"]) / mb for r in results]
+    return {
+        "baseline_mb": float(np.median([r["baseline_rss"] / mb for r in results])),
+        "per_session_mb": float(np.median(per_session)),
+        "rerun_peak_mb": float(np.max(transient)),
+        "growth_during_reruns_mb": float(np.max([(r["final_rss"] - r["opened_rss"]) / mb for r in results])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=12, help="Concurrent analyst sessions")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Sessions rerunning at the same time")
+    parser.add_argument("--reruns", type=int, default=10, help="Reruns per session after the initial paste")
+    parser.add_argument("--visitors", type=int, default=100_000, help="Visitors per arm")
+    parser.add_argument("--conv-rate", type=float, default=0.028, help="Control conversion rate (decimal); sets the orders pasted per arm")
+    parser.add_argument("--lift", type=float, default=0.05, help="Relative lift in the variant's conversion rate")
+    parser.add_argument("--aov", type=float, default=95.0, help="Average order value")
+    parser.add_argument("--revenue-sigma", type=float, default=1.0, help="Log-normal shape of order values")
+    parser.add_argument("--actions", nargs="+", choices=ACTIONS, default=list(ACTIONS), help="Inputs each session cycles through")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--script", default=SCRIPT_PATH)
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds before a single rerun fails")
+    parser.add_argument("--cache-path", help="Result cache database (default: a fresh temporary file, so every paste is computed)")
+    parser.add_argument("--out", help="Optional CSV with one row per rerun")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CRO_CACHE_PATH"] = args.cache_path or os.path.join(tmp, "results.sqlite")
+        results = run_load_test(
+            args.sessions, args.workers, args.reruns, args.visitors, args.conv_rate, args.lift,
+            args.aov, args.revenue_sigma, args.actions, args.seed, args.script, args.timeout
+        )
+
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["worker", "session", "rerun", "action", "wall_ms", "cpu_ms", "errors"])
+            for result in results:
+                for worker, session, rerun, action, wall, cpu, errors in result["samples"]:
+                    writer.writerow([worker, session, rerun, action, f"{wall * 1000:.2f}", f"{cpu * 1000:.2f}", errors])
+        print(f"Wrote {sum(len(r['samples']) for r in results)} reruns to {args.out}")
+
+    orders = round(args.visitors * args.conv_rate)
+    print(f"{args.sessions} sessions on {len(results)} workers, {args.reruns} reruns each, "
+          f"~{orders:,} orders pasted per arm")
+    print(f"{'action':10s} {'reruns':>7s}" + "".join(f"{f'p{p} ms':>9s}" for p in PERCENTILES)
+          + f"{'max ms':>9s}{'CPU p50':>9s}{'errors':>8s}")
+    for row in latency_summary(results):
+        print(f"{row['action']:10s} {row['reruns']:7d}" + "".join(f"{row[f'p{p}_ms']:9.1f}" for p in PERCENTILES)
+              + f"{row['max_ms']:9.1f}{row['cpu_p50_ms']:9.1f}{row['errors']:8d}")
+
+    memory = memory_summary(results)
+    print(f"RSS per process after warm-up: {memory['baseline_mb']:.0f} MB")
+    print(f"Held per open session: {memory['per_session_mb']:+.1f} MB "
+          f"(~{memory['per_session_mb'] * args.sessions:.0f} MB for {args.sessions} sessions in one server)")
+    print(f"Transient peak of a rerun: {memory['rerun_peak_mb']:+.1f} MB "
+          f"(~{memory['rerun_peak_mb'] * len(results):.0f} MB if {len(results)} sessions rerun at once)")
+    print(f"RSS growth during reruns: {memory['growth_during_reruns_mb']:+.1f} MB per process")
+
+
+if __name__ == "__main__":
+    main()
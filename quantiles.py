@@ -0,0 +1,187 @@
+"""
+Quantile treatment effects for order value using mergeable sketches.
+
+Each arm's order values are summarized in a fixed-size, log-bucketed
+histogram (DDSketch-style, 1% relative accuracy). Sketches are built in one
+streaming pass, merge by adding counts, and never grow with the number of
+orders, so millions of orders fit in a few kilobytes.
+
+Confidence intervals for median/p75/p90 differences come from a bootstrap
+over the sketches themselves: each replicate redraws the bucket counts from a
+multinomial, which is equivalent to resampling the orders, and all replicates
+are evaluated at once as one (replicates x buckets) array.
+
+Usage:
+    python quantiles.py orders.csv --arm-col arm --revenue-col revenue
+"""
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_QUANTILES = (0.5, 0.75, 0.9)
+
+
+class QuantileSketch:
+    """Log-bucketed histogram of positive values with bounded relative error"""
+
+    def __init__(self, relative_accuracy=0.01, min_value=0.01, max_value=1e9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self._min_index = math.ceil(math.log(min_value) / self._log_gamma)
+        self._max_index = math.ceil(math.log(max_value) / self._log_gamma)
+        # Bucket 0 holds values at or below min_value (treated as 0)
+        self.counts = np.zeros(self._max_index - self._min_index + 2, dtype=np.int64)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def update(self, values):
+        """Add a batch of values (array-like); values above max_value go to the top bucket"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        positive = values > self.min_value
+
+        index = np.zeros(values.shape, dtype=np.int64)
+        index[positive] = np.ceil(np.log(values[positive]) / self._log_gamma).astype(np.int64) - self._min_index + 1
+        np.clip(index, 0, len(self.counts) - 1, out=index)
+
+        self.counts += np.bincount(index, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        """Fold another sketch with the same parameters into this one"""
+        if other.counts.shape != self.counts.shape or other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different parameters")
+        self.counts += other.counts
+        return self
+
+    def quantiles(self, qs, counts=None):
+        """
+        Quantiles from the sketch (or from replicate counts with the same buckets)
+        Values are interpolated log-linearly by rank within their bucket, so
+        estimates move smoothly instead of jumping a whole bucket at a time.
+        counts: optional array (..., n_buckets); defaults to the sketch's own
+        Returns array (..., len(qs)); NaN where a row is empty
+        """
+        counts = self.counts if counts is None else counts
+        cumulative = np.cumsum(counts, axis=-1)
+        total = cumulative[..., -1:]
+        ranks = np.asarray(qs, dtype=float) * (total - 1)
+
+        # First bucket whose cumulative count exceeds each rank
+        index = (cumulative[..., None, :] > ranks[..., :, None]).argmax(axis=-1)
+        in_bucket = np.take_along_axis(counts, index, axis=-1)
+        before = np.take_along_axis(cumulative, index, axis=-1) - in_bucket
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position = np.clip((ranks - before + 0.5) / in_bucket, 0, 1)
+        # Bucket i covers (gamma^(k-1), gamma^k] with k = i + min_index - 1
+        values = self.gamma ** (index + self._min_index - 2 + position)
+        values = np.where(index == 0, 0.0, values)
+        return np.where(total > 0, values, np.nan)
+
+
+def sketch_values(values, relative_accuracy=0.01):
+    """Sketch of an in-memory list/array of values"""
+    return QuantileSketch(relative_accuracy).update(values)
+
+
+def read_order_sketches(source, arm_col="arm", revenue_col="revenue", chunksize=1_000_000):
+    """
+    Per-arm sketches from an order-level CSV in one streaming pass
+    Memory is bounded by the chunk size regardless of file length.
+    Returns {"A": sketch, "B": sketch}
+    """
+    from segments import normalize_arms
+
+    sketches = {"A": QuantileSketch(), "B": QuantileSketch()}
+    for chunk in pd.read_csv(source, usecols=[arm_col, revenue_col], chunksize=chunksize, dtype={arm_col: str}):
+        arms = normalize_arms(chunk[arm_col]).to_numpy()
+        revenue = pd.to_numeric(chunk[revenue_col], errors="coerce").to_numpy(dtype=float)
+        for arm, sketch in sketches.items():
+            sketch.update(revenue[arms == arm])
+    return sketches
+
+
+def quantile_effects(sketch_A, sketch_B, qs=DEFAULT_QUANTILES, n_bootstrap=2000, confidence=0.95, seed=0):
+    """
+    Quantile differences (variant - control) with bootstrap confidence intervals
+    Returns a list of dicts, one per quantile: quantile, control, variant,
+    difference, relative_difference (%, None when the control quantile is 0),
+    ci_low, ci_high, significant
+    """
+    qs = np.asarray(qs, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    point_A = sketch_A.quantiles(qs)
+    point_B = sketch_B.quantiles(qs)
+
+    ci_low = ci_high = np.full(len(qs), np.nan)
+    if sketch_A.count > 0 and sketch_B.count > 0:
+        replicates = []
+        for sketch in (sketch_A, sketch_B):
+            boot_counts = rng.multinomial(sketch.count, sketch.counts / sketch.count, size=n_bootstrap)
+            replicates.append(sketch.quantiles(qs, boot_counts))
+
+        tail = (1 - confidence) / 2 * 100
+        ci_low, ci_high = np.percentile(replicates[1] - replicates[0], [tail, 100 - tail], axis=0)
+
+    effects = []
+    for i, q in enumerate(qs):
+        difference = point_B[i] - point_A[i]
+        effects.append({
+            "quantile": float(q),
+            "control": float(point_A[i]),
+            "variant": float(point_B[i]),
+            "difference": float(difference),
+            "relative_difference": float(difference / point_A[i] * 100) if point_A[i] > 0 else None,
+            "ci_low": float(ci_low[i]),
+            "ci_high": float(ci_high[i]),
+            "significant": bool(ci_low[i] > 0 or ci_high[i] < 0),
+        })
+    return effects
+
+
+def order_value_effects(n_purchasers_A, revenue_text_A, n_purchasers_B, revenue_text_B, n_bootstrap=2000):
+    """
+    Quantile effects from the page's comma-separated order values
+    Only values actually entered are sketched (no mean-filling for missing
+    orders, which would put a false spike at the mean). Raises ValueError on
+    non-numeric input.
+    Returns {"orders_A", "orders_B", "effects"}
+    """
+    sketches = []
+    for text, n_purchasers in ((revenue_text_A, n_purchasers_A), (revenue_text_B, n_purchasers_B)):
+        values = [float(x.strip()) for x in text.split(',') if x.strip()][:n_purchasers]
+        sketches.append(sketch_values(values))
+
+    return {
+        "orders_A": sketches[0].count,
+        "orders_B": sketches[1].count,
+        "effects": quantile_effects(sketches[0], sketches[1], n_bootstrap=n_bootstrap),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Median/p75/p90 order value differences with bootstrap CIs")
+    parser.add_argument("orders", help="Order-level CSV")
+    parser.add_argument("--arm-col", default="arm")
+    parser.add_argument("--revenue-col", default="revenue")
+    parser.add_argument("--bootstrap", type=int, default=2000)
+    args = parser.parse_args()
+
+    sketches = read_order_sketches(args.orders, args.arm_col, args.revenue_col)
+    print(f"Orders: control {sketches['A'].count:,}, variant {sketches['B'].count:,}")
+    for effect in quantile_effects(sketches["A"], sketches["B"], n_bootstrap=args.bootstrap):
+        print(f"p{effect['quantile'] * 100:g}: ${effect['control']:.2f} -> ${effect['variant']:.2f} "
+              f"({effect['difference']:+.2f}, 95% CI {effect['ci_low']:+.2f} to {effect['ci_high']:+.2f})"
+              f"{' *' if effect['significant'] else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Rank-based revenue tests for zero-inflated data.
+
+Revenue per visitor is mostly zeros: every visitor who didn't buy ties at 0.
+Mann-Whitney U and Brunner-Munzel only need ranks, and all zeros share one
+midrank, so the zeros are handled as a single tie group from their count
+alone. Only the purchaser revenues are sorted, so tens of millions of visitors
+with a few percent converting take well under a second.
+
+Both tests use the normal approximation, which is accurate at the sample
+sizes A/B tests run at. Statistics are oriented so that positive values mean
+the variant (B) tends to have higher revenue.
+"""
+import numpy as np
+
+import stat_kernels
+
+
+def _midranks(n_zeros, values):
+    """
+    Midranks of n_zeros zeros plus the non-zero values, without materializing the zeros
+    Returns (zero_rank, value_ranks, tie_counts) where tie_counts includes the zero group
+    """
+    uniques, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    n_negative = counts[uniques < 0].sum()
+
+    ranks = np.cumsum(counts) - (counts - 1) / 2.0
+    ranks[uniques > 0] += n_zeros
+    zero_rank = n_negative + (n_zeros + 1) / 2.0
+    return zero_rank, ranks[inverse], np.append(counts, n_zeros)
+
+
+def _split_zeros(n_zeros, values):
+    """Fold explicit zeros in values into the zero count"""
+    values = np.asarray(values, dtype=float)
+    nonzero = values != 0
+    return n_zeros + int((~nonzero).sum()), values[nonzero]
+
+
+def mann_whitney_u(zeros_A, values_A, zeros_B, values_B):
+    """
+    Mann-Whitney U test with tie correction
+    zeros_*: number of zero observations (e.g. visitors who didn't buy)
+    values_*: the remaining observations (e.g. purchaser revenues)
+    Returns (u_B, z, p_value, prob_superiority) where prob_superiority is
+    P(B > A) + P(B = A) / 2; NaN where a sample is empty or all values tie
+    """
+    zeros_A, values_A = _split_zeros(zeros_A, values_A)
+    zeros_B, values_B = _split_zeros(zeros_B, values_B)
+    n_A = zeros_A + len(values_A)
+    n_B = zeros_B + len(values_B)
+    n = n_A + n_B
+
+    zero_rank, ranks, ties = _midranks(zeros_A + zeros_B, np.concatenate([values_A, values_B]))
+    rank_sum_B = zeros_B * zero_rank + ranks[len(values_A):].sum()
+    u_B = rank_sum_B - n_B * (n_B + 1) / 2.0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ties = ties.astype(float)
+        tie_term = (ties ** 3 - ties).sum() / (float(n) * (n - 1))
+        variance = n_A * n_B / 12.0 * ((n + 1) - tie_term)
+        z = (u_B - n_A * n_B / 2.0) / np.sqrt(variance)
+        prob_superiority = u_B / (float(n_A) * n_B)
+
+    return float(u_B), float(z), float(stat_kernels.p_value_z(z)), float(prob_superiority)
+
+
+def brunner_munzel(zeros_A, values_A, zeros_B, values_B):
+    """
+    Brunner-Munzel test (no equal-variance or equal-shape assumption)
+    Arguments as for mann_whitney_u.
+    Returns (w, p_value, prob_superiority); NaN where the statistic is undefined
+    (an empty sample, or every placement equal, e.g. complete separation)
+    """
+    zeros_A, values_A = _split_zeros(zeros_A, values_A)
+    zeros_B, values_B = _split_zeros(zeros_B, values_B)
+    n_A = zeros_A + len(values_A)
+    n_B = zeros_B + len(values_B)
+
+    # Ranks in the pooled sample and within each sample; placements are their difference
+    zero_rank, ranks, _ = _midranks(zeros_A + zeros_B, np.concatenate([values_A, values_B]))
+    pooled = {"A": (zero_rank, ranks[:len(values_A)]), "B": (zero_rank, ranks[len(values_A):])}
+    samples = {"A": (zeros_A, values_A, n_A), "B": (zeros_B, values_B, n_B)}
+
+    mean_rank = {}
+    variance = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for arm, (zeros, values, size) in samples.items():
+            own_zero_rank, own_ranks, _ = _midranks(zeros, values)
+            pooled_zero_rank, pooled_ranks = pooled[arm]
+
+            mean_rank[arm] = (zeros * pooled_zero_rank + pooled_ranks.sum()) / size
+            mean_placement = mean_rank[arm] - (size + 1) / 2.0
+            deviation_zero = pooled_zero_rank - own_zero_rank - mean_placement
+            deviations = pooled_ranks - own_ranks - mean_placement
+            variance[arm] = (zeros * deviation_zero ** 2 + (deviations ** 2).sum()) / (size - 1)
+
+        n = n_A + n_B
+        w = n_A * n_B * (mean_rank["B"] - mean_rank["A"]) / (n * np.sqrt(n_A * variance["A"] + n_B * variance["B"]))
+        prob_superiority = (mean_rank["B"] - (n_B + 1) / 2.0) / n_A
+
+    if not np.isfinite(w):
+        w = np.nan
+    return float(w), float(stat_kernels.p_value_z(w)), float(prob_superiority)
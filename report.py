@@ -0,0 +1,318 @@
+"""
+Headless batch report generator.
+
+Renders the Performance Overview, Visual Comparison and Significance sections
+of the page for many experiments into standalone HTML files (Plotly figures
+embedded as JSON, plotly.js from the CDN) plus machine-readable JSON, and an
+index page linking them all. Reports are rendered across a process pool;
+charts come from the shared templates in charts.py.
+
+Input CSV: one row per experiment with
+    experiment, visitors_A, conversions_A, revenue_sum_A, revenue_sumsq_A,
+    visitors_B, conversions_B, revenue_sum_B, revenue_sumsq_B
+and optionally variant_share (decimal, default 0.5). Alternatively, pass
+order-level exports (.npy, Arrow IPC or Parquet; see columnar.py), one per
+experiment, and the statistics are computed from the memory-mapped files.
+
+Usage:
+    python report.py experiments.csv --out-dir reports/
+    python report.py exports/*.parquet --out-dir reports/
+"""
+import argparse
+import html
+import json
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+
+import pandas as pd
+from plotly.offline import get_plotlyjs_version
+
+import columnar
+from calculations import ARM_STAT_COLUMNS, analyze_sufficient_stats, calculate_srm, significance_verdict
+from charts import comparison_chart_spec, format_chart_value
+
+INPUT_COLUMNS = ["experiment"] + [f"{stat}_{arm}" for arm in ("A", "B") for stat in ARM_STAT_COLUMNS]
+
+# Base names of the files generate_reports writes next to the per-experiment reports
+RESERVED_NAMES = ("index", "summary")
+
+# (key in results, display name, statistic label, is_currency)
+METRICS = [
+    ("conv", "Conversion Rate", "Z-Score", False),
+    ("arpu", "Revenue Per Visitor", "T-Score", True),
+    ("aov", "Average Order Value", "T-Score", True),
+]
+
+VERDICT_LABELS = {
+    "significant": "✅ Significant",
+    "marginal": "⚠️ Marginal",
+    "not_significant": "❌ Inconclusive",
+    "withheld": "⛔ Withheld (SRM)",
+    "untestable": "— Not enough data",
+}
+
+PAGE_STYLE = """
+    body { font-family: 'Inter', sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); margin: 0; padding: 3rem 1rem; }
+    main { max-width: 1400px; margin: 0 auto; }
+    h1 { color: white; font-weight: 800; font-size: 2.5rem; text-align: center; margin-bottom: 0.5rem; }
+    h2 { color: white; font-weight: 700; font-size: 1.6rem; margin-top: 2rem; }
+    .subtitle { color: rgba(255,255,255,0.95); text-align: center; font-weight: 500; margin-bottom: 2rem; }
+    .row { display: grid; grid-template-columns: repeat(3, 1fr); gap: 1.5rem; }
+    .card { background: white; padding: 1.5rem 2rem; border-radius: 16px; box-shadow: 0 4px 6px rgba(0,0,0,0.07); }
+    .label { font-size: 0.875rem; font-weight: 600; color: #64748b; text-transform: uppercase; letter-spacing: 0.05em; }
+    .value { font-size: 2rem; font-weight: 800; color: #1e293b; }
+    .delta { font-weight: 700; }
+    .up { color: #16a34a; } .down { color: #dc2626; }
+    .caption { color: #64748b; font-size: 0.875rem; }
+    table { width: 100%; border-collapse: collapse; }
+    th, td { text-align: left; padding: 0.6rem 0.75rem; border-bottom: 1px solid #f1f5f9; color: #1e293b; }
+    th { color: #64748b; font-size: 0.8rem; text-transform: uppercase; letter-spacing: 0.05em; }
+    .alert { background: white; border-radius: 12px; border-left: 4px solid; padding: 1rem 1.25rem; font-weight: 500; margin-bottom: 1rem; }
+    .alert.ok { border-color: #16a34a; } .alert.bad { border-color: #dc2626; }
+    a { color: #667eea; font-weight: 600; }
+"""
+
+REPORT_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title | CRO Test Report</title>
+<link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap" rel="stylesheet">
+<script src="https://cdn.plot.ly/plotly-$plotly_version.min.js"></script>
+<style>$style</style>
+</head>
+<body>
+<main>
+<h1>🎯 $title</h1>
+<p class="subtitle">CRO Test Report</p>
+
+<h2>📊 Performance Overview</h2>
+<div class="row">$overview</div>
+
+<h2>📈 Visual Comparison</h2>
+<div class="row">$chart_divs</div>
+
+<h2>🔬 Statistical Significance Analysis</h2>
+$srm_alert
+<div class="card"><table>
+<tr><th>Metric</th><th>Relative Lift</th><th>Statistic</th><th>P-Value</th><th>Confidence</th><th>Result</th></tr>
+$test_rows
+</table></div>
+</main>
+<script>
+const figures = $figures;
+for (const [id, fig] of Object.entries(figures)) {
+    Plotly.newPlot(id, fig.data, fig.layout, {displayModeBar: false, responsive: true});
+}
+</script>
+</body>
+</html>
+""")
+
+INDEX_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>CRO Test Reports</title>
+<style>$style</style>
+</head>
+<body>
+<main>
+<h1>🎯 CRO Test Reports</h1>
+<p class="subtitle">$count experiments</p>
+<div class="card"><table>
+<tr><th>Experiment</th><th>SRM</th><th>Conversion Rate</th><th>Revenue Per Visitor</th><th>Average Order Value</th></tr>
+$rows
+</table></div>
+</main>
+</body>
+</html>
+""")
+
+
+def report_filename(experiment):
+    """Filesystem-safe base name for an experiment's report files"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(experiment)).strip("_") or "experiment"
+
+
+def metric_verdicts(results, srm_failed):
+    """Verdict per metric key; withheld when the SRM check fails, untestable without a p-value"""
+    verdicts = {}
+    for key, _, _, _ in METRICS:
+        p_value = results[f"p_value_{key}"]
+        if p_value is None:
+            verdicts[key] = "untestable"
+        elif srm_failed:
+            verdicts[key] = "withheld"
+        else:
+            verdicts[key] = significance_verdict(p_value)
+    return verdicts
+
+
+def build_report(row):
+    """
+    Analyze one experiment row
+    Returns the JSON-serializable report: inputs, results, SRM check and a
+    verdict per metric (withheld when the SRM check fails).
+    """
+    stats = {col: float(row[col]) for col in INPUT_COLUMNS[1:]}
+    variant_share = float(row.get("variant_share", 0.5))
+    if math.isnan(variant_share):
+        variant_share = 0.5
+
+    results = analyze_sufficient_stats(*(stats[col] for col in INPUT_COLUMNS[1:]))
+    srm_chi2, srm_p_value, srm_failed = calculate_srm(stats["visitors_A"], stats["visitors_B"], variant_share)
+
+    return {
+        "experiment": str(row["experiment"]),
+        "inputs": dict(stats, variant_share=variant_share),
+        "results": results,
+        "srm": {"chi2": srm_chi2, "p_value": srm_p_value, "mismatch": srm_failed},
+        "verdicts": metric_verdicts(results, srm_failed),
+    }
+
+
+def render_html(report):
+    """Standalone HTML for one report"""
+    results = report["results"]
+    value_keys = {"conv": "conv_rate", "arpu": "arpu", "aov": "aov"}
+
+    overview = []
+    chart_divs = []
+    figures = {}
+    test_rows = []
+    for key, name, stat_label, is_currency in METRICS:
+        control = results[f"{value_keys[key]}_A"]
+        variant = results[f"{value_keys[key]}_B"]
+        lift = results[f"{key}_lift"]
+
+        overview.append(
+            f'<div class="card"><div class="label">{name}</div>'
+            f'<div class="value">{format_chart_value(variant, is_currency)}</div>'
+            f'<div class="delta {"up" if lift >= 0 else "down"}">{lift:+.1f}% vs control</div>'
+            f'<div class="caption">Control: {format_chart_value(control, is_currency)}</div></div>'
+        )
+
+        chart_id = f"chart-{key}"
+        chart_divs.append(f'<div class="card" id="{chart_id}"></div>')
+        figures[chart_id] = comparison_chart_spec(control, variant, name, is_currency)
+
+        statistic = results["z_stat_conv"] if key == "conv" else results[f"t_stat_{key}"]
+        p_value = results[f"p_value_{key}"]
+        if p_value is None:
+            cells = ["n/a", "n/a", "n/a"]
+        else:
+            cells = [f"{statistic:.3f}", f"{p_value:.4f}", f"{(1 - p_value) * 100:.2f}%"]
+        test_rows.append(
+            f"<tr><td>{name}</td><td>{lift:+.2f}%</td><td>{stat_label} {cells[0]}</td>"
+            f"<td>{cells[1]}</td><td>{cells[2]}</td><td>{VERDICT_LABELS[report['verdicts'][key]]}</td></tr>"
+        )
+
+    srm = report["srm"]
+    if srm["mismatch"]:
+        srm_alert = (f'<div class="alert bad">⛔ <b>Sample Ratio Mismatch</b> — p = {srm["p_value"]:.2e}. '
+                     f'Verdicts are withheld until the assignment issue is resolved.</div>')
+    else:
+        srm_alert = '<div class="alert ok">✅ <b>Traffic split looks healthy</b> — consistent with the configured allocation.</div>'
+
+    return REPORT_TEMPLATE.substitute(
+        title=html.escape(report["experiment"]),
+        plotly_version=get_plotlyjs_version(),
+        style=PAGE_STYLE,
+        overview="".join(overview),
+        chart_divs="".join(chart_divs),
+        srm_alert=srm_alert,
+        test_rows="\n".join(test_rows),
+        # Escape "</" so experiment names can't close the script tag
+        figures=json.dumps(figures).replace("</", "<\\/"),
+    )
+
+
+def _render_chunk(args):
+    """Worker: build and write reports for a chunk of rows, return index entries"""
+    rows, names, out_dir = args
+    entries = []
+    for row, name in zip(rows, names):
+        report = build_report(row)
+        with open(os.path.join(out_dir, f"{name}.html"), "w", encoding="utf-8") as f:
+            f.write(render_html(report))
+        with open(os.path.join(out_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        entries.append({"experiment": report["experiment"], "file": name, "srm": report["srm"]["mismatch"],
+                        "verdicts": report["verdicts"]})
+    return entries
+
+
+def generate_reports(experiments, out_dir, workers=None, chunk_size=25):
+    """
+    Write one HTML + JSON report per experiment row, plus index.html and summary.json
+    experiments: DataFrame with INPUT_COLUMNS (and optionally variant_share)
+    Returns the index entries.
+    """
+    missing = [col for col in INPUT_COLUMNS if col not in experiments.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    rows = experiments.to_dict("records")
+
+    # Unique file names, assigned up front so workers never collide; compared
+    # case-insensitively and never index/summary, whose files are written last
+    names = []
+    seen = set(RESERVED_NAMES)
+    for row in rows:
+        base = name = report_filename(row["experiment"])
+        suffix = 2
+        while name.lower() in seen:
+            name = f"{base}-{suffix}"
+            suffix += 1
+        seen.add(name.lower())
+        names.append(name)
+
+    chunks = [(rows[i:i + chunk_size], names[i:i + chunk_size], out_dir) for i in range(0, len(rows), chunk_size)]
+
+    if workers == 1:
+        entries = [entry for chunk in map(_render_chunk, chunks) for entry in chunk]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            entries = [entry for chunk in executor.map(_render_chunk, chunks) for entry in chunk]
+
+    index_rows = "\n".join(
+        f'<tr><td><a href="{entry["file"]}.html">{html.escape(entry["experiment"])}</a></td>'
+        f'<td>{"⛔ Mismatch" if entry["srm"] else "✅ OK"}</td>'
+        + "".join(f"<td>{VERDICT_LABELS[entry['verdicts'][key]]}</td>" for key, _, _, _ in METRICS)
+        + "</tr>"
+        for entry in entries
+    )
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(INDEX_TEMPLATE.substitute(style=PAGE_STYLE, count=len(entries), rows=index_rows))
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2)
+
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render static HTML/JSON reports for many experiments")
+    parser.add_argument("experiments", nargs="+",
+                        help="CSV with one row of sufficient statistics per experiment, or one order-level export per experiment")
+    parser.add_argument("--arm-col", default="arm", help="Arm column of order-level exports")
+    parser.add_argument("--revenue-col", default="revenue", help="Revenue column of order-level exports")
+    parser.add_argument("--out-dir", default="reports")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=25, help="Reports per worker task")
+    args = parser.parse_args()
+
+    if len(args.experiments) == 1 and not columnar.is_columnar(args.experiments[0]):
+        experiments = pd.read_csv(args.experiments[0])
+    else:
+        experiments = columnar.read_experiments(args.experiments, args.arm_col, args.revenue_col)
+    entries = generate_reports(experiments, args.out_dir, args.workers, args.chunk_size)
+    print(f"Wrote {len(entries)} reports to {args.out_dir}/ (open index.html)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Persistent, content-addressed cache of computed results.
+
+Entries are keyed by a SHA-256 of the normalized inputs and stored as JSON in
+a SQLite database, so every app replica (and batch job) pointing at the same
+file shares results: the second person to open an experiment gets a cache
+hit whichever process serves them. SQLite's WAL mode and busy timeout handle
+concurrent readers and writers across processes; the total size is bounded
+by evicting least recently used entries.
+
+The database must live on a local or block-backed volume shared by the
+replicas (not NFS, where SQLite locking is unreliable).
+
+Configuration:
+    CRO_CACHE_PATH    database file (default ~/.cache/cro_calculator/results.sqlite)
+    CRO_CACHE_MAX_MB  size budget in megabytes (default 256)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Bump when the meaning of cached results changes to invalidate old entries
+CACHE_VERSION = 5
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Writers wait this long for the lock; a hit's LRU touch only waits TOUCH_BUSY_TIMEOUT_MS
+BUSY_TIMEOUT = 30
+TOUCH_BUSY_TIMEOUT_MS = 50
+# Hits within this many seconds of the last touch don't write at all
+TOUCH_INTERVAL = 60
+
+
+def default_cache_path():
+    """Database location from CRO_CACHE_PATH, else the user cache directory"""
+    return os.environ.get(
+        "CRO_CACHE_PATH",
+        os.path.join(os.path.expanduser("~"), ".cache", "cro_calculator", "results.sqlite")
+    )
+
+
+def make_key(namespace, inputs):
+    """
+    Content address for a computation
+    namespace: name of the computation (e.g. "analysis")
+    inputs: JSON-serializable, already-normalized inputs
+    """
+    payload = json.dumps([namespace, CACHE_VERSION, inputs], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU cache of JSON results in a SQLite file"""
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or default_cache_path()
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("CRO_CACHE_MAX_MB", DEFAULT_MAX_BYTES / 2 ** 20)) * 2 ** 20)
+        self.max_bytes = max_bytes
+        # One connection per thread: Streamlit serves sessions from a thread pool
+        self._local = threading.local()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; writes take explicit BEGIN IMMEDIATE transactions
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Cached value for key, or None on a miss"""
+        conn = self._connection()
+        row = conn.execute("SELECT value, last_access FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        value, last_access = row
+        now = time.time()
+        if now - last_access > TOUCH_INTERVAL:
+            self._touch(conn, key, now)
+        return json.loads(value)
+
+    def _touch(self, conn, key, now):
+        """
+        Best-effort LRU bump for a hit: reads never wait on a writer, so a
+        touch that can't get the write lock almost immediately is dropped
+        """
+        conn.execute(f"PRAGMA busy_timeout = {TOUCH_BUSY_TIMEOUT_MS}")
+        try:
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.OperationalError:
+            pass
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT * 1000}")
+
+    def put(self, key, value):
+        """Store value under key, evicting least recently used entries if over budget"""
+        data = json.dumps(value).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time())
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn):
+        """Drop oldest entries until the total size fits the budget (inside a write transaction)"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def get_or_compute(self, key, compute):
+        """
+        Cached value for key, computing and storing it on a miss
+        Concurrent misses for the same key may both compute; the results are
+        identical so the last write simply wins.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        """Entry count and total stored bytes"""
+        count, total = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
@@ -0,0 +1,191 @@
+"""
+Segment breakdowns (device, country, channel, ...) from visitor-level files.
+
+The file is reduced to sufficient statistics per (segment, arm) in a single
+grouped pass: visitors, conversions, revenue sum and revenue sum of squares.
+Every test afterwards runs vectorized across all segments from those sums, so
+the cost is dominated by one read of the data.
+"""
+import numpy as np
+import pandas as pd
+
+import stat_kernels
+from calculations import ARM_STAT_COLUMNS
+
+# Accepted spellings for the arm column, normalized to A (control) / B (variant)
+ARM_LABELS = {
+    "a": "A", "control": "A", "0": "A",
+    "b": "B", "variant": "B", "treatment": "B", "1": "B",
+}
+
+STAT_COLUMNS = ARM_STAT_COLUMNS
+
+
+def normalize_arms(arm):
+    """Map an arm column onto 'A'/'B'; unknown labels become None and are dropped"""
+    # Normalize each distinct label once instead of every row
+    codes, uniques = pd.factorize(arm)
+    labels = np.array([ARM_LABELS.get(str(u).strip().lower()) for u in uniques] + [None], dtype=object)
+    return pd.Series(labels[codes], index=arm.index)
+
+
+def read_columns(source):
+    """Column names of a CSV without reading its rows"""
+    columns = pd.read_csv(source, nrows=0).columns.tolist()
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return columns
+
+
+def _numeric_revenue(values, revenue_col):
+    """
+    Revenue as floats, blanks as 0
+    Raises ValueError naming the first offending values when any non-empty
+    value isn't a number (e.g. "1,234.50", or a country column picked as
+    revenue) instead of reading it as a zero.
+    """
+    revenue = pd.to_numeric(values, errors="coerce")
+    if not pd.api.types.is_numeric_dtype(values):
+        non_empty = values.notna() & (values.astype(str).str.strip() != "")
+        failed = values[revenue.isna() & non_empty]
+        if len(failed):
+            examples = ", ".join(repr(str(value)) for value in failed.unique()[:3])
+            raise ValueError(f"Revenue column '{revenue_col}' has {len(failed):,} non-numeric value(s), e.g. {examples}")
+    return revenue.fillna(0.0).astype(float)
+
+
+def _group_sums(df, segment_col, arm_col, revenue_col, converted_col):
+    """Long-format sufficient statistics for one frame (or chunk)"""
+    revenue = _numeric_revenue(df[revenue_col], revenue_col)
+    if converted_col:
+        converted = df[converted_col].astype(bool)
+    else:
+        converted = revenue > 0
+
+    frame = pd.DataFrame({
+        "segment": df[segment_col],
+        "arm": normalize_arms(df[arm_col]),
+        "visitors": 1,
+        "conversions": converted.astype(np.int64),
+        "revenue_sum": revenue,
+        "revenue_sumsq": revenue ** 2,
+    }).dropna(subset=["arm"])
+
+    return frame.groupby(["segment", "arm"], sort=False, observed=True)[STAT_COLUMNS].sum()
+
+
+def _to_wide(long_stats):
+    """Pivot (segment, arm) rows into one row per segment with _A/_B columns"""
+    wide = long_stats.unstack("arm", fill_value=0)
+    for arm in ("A", "B"):
+        for stat in STAT_COLUMNS:
+            if (stat, arm) not in wide.columns:
+                wide[(stat, arm)] = 0
+    wide.columns = [f"{stat}_{arm}" for stat, arm in wide.columns]
+    wide.index = wide.index.astype(str)
+    columns = [f"{stat}_{arm}" for arm in ("A", "B") for stat in STAT_COLUMNS]
+    return wide[columns].sort_index()
+
+
+def aggregate_segments(df, segment_col, arm_col="arm", revenue_col="revenue", converted_col=None):
+    """
+    Sufficient statistics per segment from a visitor-level DataFrame
+    One row per visitor; revenue is 0 for visitors who did not purchase.
+    If converted_col is not given, a visitor counts as converted when revenue > 0.
+    """
+    return _to_wide(_group_sums(df, segment_col, arm_col, revenue_col, converted_col))
+
+
+def read_segment_stats(source, segment_col, arm_col="arm", revenue_col="revenue",
+                       converted_col=None, chunksize=1_000_000):
+    """
+    Sufficient statistics per segment from a visitor-level CSV
+    The file is streamed in chunks so memory stays bounded; partial sums from
+    each chunk are merged at the end.
+    """
+    usecols = [segment_col, arm_col, revenue_col] + ([converted_col] if converted_col else [])
+    partials = [
+        _group_sums(chunk, segment_col, arm_col, revenue_col, converted_col)
+        for chunk in pd.read_csv(source, usecols=usecols, chunksize=chunksize,
+                                 dtype={segment_col: str, arm_col: str})
+    ]
+    if not partials:
+        raise ValueError("No rows found in segment file")
+
+    merged = pd.concat(partials).groupby(level=["segment", "arm"], sort=False).sum()
+    return _to_wide(merged)
+
+
+def analyze_segments(seg_stats, correction="holm"):
+    """
+    Conversion, RPV and AOV tests for every segment at once
+    seg_stats: output of aggregate_segments / read_segment_stats
+    correction: multiplicity correction applied across segments per metric
+    Rates and lifts are percentages, matching the main page.
+    """
+    s = {col: seg_stats[col].to_numpy(dtype=float) for col in seg_stats.columns}
+    result = pd.DataFrame(index=seg_stats.index)
+    result["visitors_A"] = s["visitors_A"].astype(np.int64)
+    result["visitors_B"] = s["visitors_B"].astype(np.int64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Conversion rate
+        conv_rate_A = s["conversions_A"] / s["visitors_A"] * 100
+        conv_rate_B = s["conversions_B"] / s["visitors_B"] * 100
+        z_stat, p_conv = stat_kernels.z_test_proportions(
+            s["conversions_A"], s["visitors_A"], s["conversions_B"], s["visitors_B"]
+        )
+        result["conv_rate_A"] = conv_rate_A
+        result["conv_rate_B"] = conv_rate_B
+        result["conv_lift"] = np.where(conv_rate_A > 0, (conv_rate_B - conv_rate_A) / conv_rate_A * 100, 0.0)
+        result["z_stat_conv"] = z_stat
+        result["p_value_conv"] = p_conv
+        result["p_adj_conv"] = stat_kernels.adjust_p_values(p_conv, correction)
+
+        # Revenue per visitor (all visitors, zeros included)
+        rpv_A, sd_rpv_A = stat_kernels.mean_sd_from_sums(s["visitors_A"], s["revenue_sum_A"], s["revenue_sumsq_A"])
+        rpv_B, sd_rpv_B = stat_kernels.mean_sd_from_sums(s["visitors_B"], s["revenue_sum_B"], s["revenue_sumsq_B"])
+        t_rpv, _, p_rpv = stat_kernels.welch_t_test(rpv_A, sd_rpv_A, s["visitors_A"], rpv_B, sd_rpv_B, s["visitors_B"])
+        result["rpv_A"] = rpv_A
+        result["rpv_B"] = rpv_B
+        result["rpv_lift"] = np.where(rpv_A > 0, (rpv_B - rpv_A) / rpv_A * 100, 0.0)
+        result["t_stat_rpv"] = t_rpv
+        result["p_value_rpv"] = p_rpv
+        result["p_adj_rpv"] = stat_kernels.adjust_p_values(p_rpv, correction)
+
+        # Average order value (purchasers only)
+        aov_A, sd_aov_A = stat_kernels.mean_sd_from_sums(s["conversions_A"], s["revenue_sum_A"], s["revenue_sumsq_A"])
+        aov_B, sd_aov_B = stat_kernels.mean_sd_from_sums(s["conversions_B"], s["revenue_sum_B"], s["revenue_sumsq_B"])
+        t_aov, _, p_aov = stat_kernels.welch_t_test(aov_A, sd_aov_A, s["conversions_A"], aov_B, sd_aov_B, s["conversions_B"])
+        result["aov_A"] = aov_A
+        result["aov_B"] = aov_B
+        result["aov_lift"] = np.where(aov_A > 0, (aov_B - aov_A) / aov_A * 100, 0.0)
+        result["t_stat_aov"] = t_aov
+        result["p_value_aov"] = p_aov
+        result["p_adj_aov"] = stat_kernels.adjust_p_values(p_aov, correction)
+
+    return result
+
+
+def interaction_tests(seg_stats):
+    """
+    Does the treatment effect differ between segments?
+    Cochran's Q on the per-segment absolute differences for each metric.
+    Returns {metric: (q_stat, df, p_value)}
+    """
+    s = {col: seg_stats[col].to_numpy(dtype=float) for col in seg_stats.columns}
+    tests = {}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_A = s["conversions_A"] / s["visitors_A"]
+        p_B = s["conversions_B"] / s["visitors_B"]
+        se_conv = np.sqrt(p_A * (1 - p_A) / s["visitors_A"] + p_B * (1 - p_B) / s["visitors_B"])
+        tests["Conversion Rate"] = stat_kernels.heterogeneity_test(p_B - p_A, se_conv)
+
+        for metric, n_col in (("Revenue Per Visitor", "visitors"), ("Average Order Value", "conversions")):
+            mean_A, sd_A = stat_kernels.mean_sd_from_sums(s[f"{n_col}_A"], s["revenue_sum_A"], s["revenue_sumsq_A"])
+            mean_B, sd_B = stat_kernels.mean_sd_from_sums(s[f"{n_col}_B"], s["revenue_sum_B"], s["revenue_sumsq_B"])
+            se = np.sqrt(sd_A ** 2 / s[f"{n_col}_A"] + sd_B ** 2 / s[f"{n_col}_B"])
+            tests[metric] = stat_kernels.heterogeneity_test(mean_B - mean_A, se)
+
+    return {metric: tuple(float(x) for x in test) for metric, test in tests.items()}
@@ -0,0 +1,289 @@
+"""
+Monte Carlo A/A and power simulation for the calculator's decision rules.
+
+Synthetic experiments are generated day by day (Poisson traffic, binomial
+conversions, log-normal order values) and analyzed with the same kernels and
+thresholds the page uses. Each experiment is evaluated under three rules:
+
+- fixed_horizon: a single look at the planned end date, p < 0.05
+- daily_peeking: look every day and call it the first time p < 0.05
+- app_rule: look every day, but only call it once the page would say the
+  test is ready (at least MIN_TEST_DAYS and the required sample size reached)
+
+With lift 0 the rejection rate is the empirical false positive rate; with a
+real lift it is the empirical power.
+
+Usage:
+    python simulation.py --traffic 2000 5000 10000 --lift 0 0.05 0.10 \\
+        --experiments 5000 --out simulation.csv --plot simulation.html
+"""
+import argparse
+import csv
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import stat_kernels
+from calculations import MIN_TEST_DAYS, SIGNIFICANCE_LEVEL
+
+METRICS = ("conversion", "rpv", "aov")
+DECISION_RULES = ("fixed_horizon", "daily_peeking", "app_rule")
+
+
+def simulate_daily_stats(rng, n_experiments, days, daily_visitors, conv_rate, lift=0.0,
+                         aov=95.0, aov_lift=0.0, revenue_sigma=1.0):
+    """
+    Generate per-day sufficient statistics for a batch of experiments
+    daily_visitors: expected total visitors per day, split 50/50
+    lift / aov_lift: relative lift applied to the variant's conversion rate / AOV
+    revenue_sigma: log-normal shape of order values (larger = heavier tail)
+    Returns {stat_arm: array of shape (n_experiments, days)}
+    """
+    stats = {}
+    visitors_total = rng.poisson(daily_visitors, size=(n_experiments, days))
+    visitors_A = rng.binomial(visitors_total, 0.5)
+    arms = (
+        ("A", visitors_A, conv_rate, aov),
+        ("B", visitors_total - visitors_A, conv_rate * (1 + lift), aov * (1 + aov_lift)),
+    )
+
+    for arm, visitors, rate, mean_order in arms:
+        conversions = rng.binomial(visitors, min(rate, 1.0))
+        # Log-normal with the requested mean: E[X] = exp(mu + sigma^2 / 2)
+        mu = math.log(mean_order) - revenue_sigma ** 2 / 2
+
+        # Draw every order individually, one day at a time to bound memory,
+        # and reduce to per-experiment sums with bincount
+        revenue_sum = np.zeros((n_experiments, days))
+        revenue_sumsq = np.zeros((n_experiments, days))
+        experiment_index = np.arange(n_experiments)
+        for day in range(days):
+            orders = conversions[:, day]
+            values = rng.lognormal(mu, revenue_sigma, orders.sum())
+            owner = np.repeat(experiment_index, orders)
+            revenue_sum[:, day] = np.bincount(owner, values, n_experiments)
+            revenue_sumsq[:, day] = np.bincount(owner, values ** 2, n_experiments)
+
+        stats[f"visitors_{arm}"] = visitors
+        stats[f"conversions_{arm}"] = conversions
+        stats[f"revenue_sum_{arm}"] = revenue_sum
+        stats[f"revenue_sumsq_{arm}"] = revenue_sumsq
+
+    return stats
+
+
+def cumulative_p_values(daily_stats):
+    """
+    p-values each day would show if someone looked at the cumulative data
+    Returns {metric: array of shape (n_experiments, days)}; NaN = not testable
+    """
+    c = {key: np.cumsum(value, axis=1, dtype=float) for key, value in daily_stats.items()}
+
+    _, p_conv = stat_kernels.z_test_proportions(c["conversions_A"], c["visitors_A"], c["conversions_B"], c["visitors_B"])
+
+    rpv_A, sd_rpv_A = stat_kernels.mean_sd_from_sums(c["visitors_A"], c["revenue_sum_A"], c["revenue_sumsq_A"])
+    rpv_B, sd_rpv_B = stat_kernels.mean_sd_from_sums(c["visitors_B"], c["revenue_sum_B"], c["revenue_sumsq_B"])
+    _, _, p_rpv = stat_kernels.welch_t_test(rpv_A, sd_rpv_A, c["visitors_A"], rpv_B, sd_rpv_B, c["visitors_B"])
+
+    aov_A, sd_aov_A = stat_kernels.mean_sd_from_sums(c["conversions_A"], c["revenue_sum_A"], c["revenue_sumsq_A"])
+    aov_B, sd_aov_B = stat_kernels.mean_sd_from_sums(c["conversions_B"], c["revenue_sum_B"], c["revenue_sumsq_B"])
+    _, _, p_aov = stat_kernels.welch_t_test(aov_A, sd_aov_A, c["conversions_A"], aov_B, sd_aov_B, c["conversions_B"])
+
+    return {"conversion": p_conv, "rpv": p_rpv, "aov": p_aov}
+
+
+def ready_to_conclude(daily_stats, mde, alpha=SIGNIFICANCE_LEVEL):
+    """
+    Days on which the page would show "Test is ready to conclude"
+    Same inputs as the page: observed control conversion rate, the MDE and
+    cumulative traffic, plus the MIN_TEST_DAYS minimum.
+    Returns a boolean array of shape (n_experiments, days)
+    """
+    visitors_A = np.cumsum(daily_stats["visitors_A"], axis=1, dtype=float)
+    visitors_B = np.cumsum(daily_stats["visitors_B"], axis=1, dtype=float)
+    conversions_A = np.cumsum(daily_stats["conversions_A"], axis=1, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        baseline = conversions_A / visitors_A
+        required_total = 2 * np.ceil(stat_kernels.sample_size_proportions(baseline, mde, alpha))
+
+    day_number = np.arange(1, visitors_A.shape[1] + 1)
+    # NaN/inf requirements (no control conversions yet) never count as reached
+    return (day_number >= MIN_TEST_DAYS) & (visitors_A + visitors_B >= required_total)
+
+
+def decide(p_values, ready, alpha=SIGNIFICANCE_LEVEL):
+    """
+    Apply every decision rule to daily p-values
+    Returns {rule: boolean array of shape (n_experiments,)}
+    """
+    significant = p_values < alpha  # NaN compares False
+    return {
+        "fixed_horizon": significant[:, -1],
+        "daily_peeking": significant.any(axis=1),
+        "app_rule": (significant & ready).any(axis=1),
+    }
+
+
+def _run_batch(args):
+    """Simulate one batch and count rejections per (metric, rule)"""
+    seed, n_experiments, params = args
+    rng = np.random.default_rng(seed)
+
+    daily_stats = simulate_daily_stats(
+        rng, n_experiments, params["days"], params["daily_visitors"], params["conv_rate"],
+        params["lift"], params["aov"], params["aov_lift"], params["revenue_sigma"]
+    )
+    p_values = cumulative_p_values(daily_stats)
+    ready = ready_to_conclude(daily_stats, params["mde"])
+
+    counts = np.zeros((len(METRICS), len(DECISION_RULES)), dtype=np.int64)
+    for i, metric in enumerate(METRICS):
+        decisions = decide(p_values[metric], ready)
+        for j, rule in enumerate(DECISION_RULES):
+            counts[i, j] = decisions[rule].sum()
+
+    return counts
+
+
+def _batches(seed_sequence, n_experiments, batch_size, params):
+    """Split a run into batches with independent, reproducible seeds"""
+    n_batches = math.ceil(n_experiments / batch_size)
+    seeds = seed_sequence.spawn(n_batches)
+    sizes = [batch_size] * (n_batches - 1) + [n_experiments - batch_size * (n_batches - 1)]
+    return [(seed, size, params) for seed, size in zip(seeds, sizes)]
+
+
+def _summarize(counts, n_experiments, params):
+    """One row per (metric, rule) with rejection rate and Monte Carlo error"""
+    rows = []
+    for i, metric in enumerate(METRICS):
+        for j, rule in enumerate(DECISION_RULES):
+            rate = counts[i, j] / n_experiments
+            rows.append({
+                "daily_visitors": params["daily_visitors"],
+                "lift": params["lift"],
+                "aov_lift": params["aov_lift"],
+                "metric": metric,
+                "rule": rule,
+                "rejection_rate": rate,
+                "mc_std_error": math.sqrt(rate * (1 - rate) / n_experiments),
+                "experiments": n_experiments,
+            })
+    return rows
+
+
+def sweep(traffic_grid, lift_grid, n_experiments=2000, days=28, conv_rate=0.028, aov=95.0,
+          aov_lift=0.0, revenue_sigma=1.0, mde=0.10, seed=0, workers=None, batch_size=250):
+    """
+    Rejection rates over a grid of daily traffic and relative lift
+    Results depend only on seed and batch_size, not on the number of workers.
+    Returns a list of row dicts (see _summarize).
+    """
+    grid = [(traffic, lift) for traffic in traffic_grid for lift in lift_grid]
+    point_seeds = np.random.SeedSequence(seed).spawn(len(grid))
+
+    jobs = []
+    for point_seed, (traffic, lift) in zip(point_seeds, grid):
+        params = {
+            "days": days, "daily_visitors": traffic, "conv_rate": conv_rate, "lift": lift,
+            "aov": aov, "aov_lift": aov_lift, "revenue_sigma": revenue_sigma, "mde": mde,
+        }
+        jobs.append((params, _batches(point_seed, n_experiments, batch_size, params)))
+
+    all_batches = [batch for _, point_batches in jobs for batch in point_batches]
+    if workers == 1:
+        batch_counts = list(map(_run_batch, all_batches))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batch_counts = list(executor.map(_run_batch, all_batches))
+
+    rows = []
+    position = 0
+    for params, point_batches in jobs:
+        counts = sum(batch_counts[position:position + len(point_batches)])
+        position += len(point_batches)
+        rows.extend(_summarize(counts, n_experiments, params))
+
+    return rows
+
+
+def create_curves_figure(rows):
+    """FPR/power curves: rejection rate vs lift, one panel per metric"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    titles = {"conversion": "Conversion Rate", "rpv": "Revenue Per Visitor", "aov": "Average Order Value"}
+    fig = make_subplots(rows=1, cols=len(METRICS), subplot_titles=[titles[m] for m in METRICS], shared_yaxes=True)
+    dash = {"fixed_horizon": "solid", "daily_peeking": "dot", "app_rule": "dash"}
+    palette = ['#667eea', '#764ba2', '#94a3b8', '#1e293b', '#f59e0b', '#10b981']
+    traffic_levels = sorted({row["daily_visitors"] for row in rows})
+
+    for col, metric in enumerate(METRICS, start=1):
+        for t, traffic in enumerate(traffic_levels):
+            for rule in DECISION_RULES:
+                points = sorted(
+                    (row["lift"], row["rejection_rate"]) for row in rows
+                    if row["metric"] == metric and row["rule"] == rule and row["daily_visitors"] == traffic
+                )
+                fig.add_trace(go.Scatter(
+                    x=[p[0] * 100 for p in points],
+                    y=[p[1] * 100 for p in points],
+                    mode='lines+markers',
+                    name=f"{traffic:,}/day · {rule}",
+                    legendgroup=f"{traffic}-{rule}",
+                    showlegend=col == 1,
+                    line=dict(color=palette[t % len(palette)], dash=dash[rule]),
+                ), row=1, col=col)
+        fig.add_hline(y=SIGNIFICANCE_LEVEL * 100, line=dict(color='#ef4444', width=1, dash='dot'), row=1, col=col)
+        fig.update_xaxes(title_text="True lift (%)", row=1, col=col)
+
+    fig.update_yaxes(title_text="Rejection rate (%)", row=1, col=1)
+    fig.update_layout(
+        title="False positive rate (lift = 0) and power by decision rule",
+        font=dict(family='Inter', color='#1e293b'),
+        paper_bgcolor='white',
+        plot_bgcolor='white',
+        height=450,
+    )
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--traffic", type=int, nargs="+", default=[2000, 5000, 10000], help="Total visitors per day")
+    parser.add_argument("--lift", type=float, nargs="+", default=[0.0, 0.05, 0.10, 0.15], help="True relative lift in conversion rate (0 = A/A)")
+    parser.add_argument("--aov-lift", type=float, default=0.0, help="True relative lift in AOV")
+    parser.add_argument("--experiments", type=int, default=2000, help="Simulated experiments per grid point")
+    parser.add_argument("--days", type=int, default=28, help="Planned test duration in days")
+    parser.add_argument("--conv-rate", type=float, default=0.028, help="Control conversion rate (decimal)")
+    parser.add_argument("--aov", type=float, default=95.0, help="Control average order value")
+    parser.add_argument("--revenue-sigma", type=float, default=1.0, help="Log-normal shape of order values")
+    parser.add_argument("--mde", type=float, default=0.10, help="MDE used for the page's sample size requirement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=250, help="Experiments per worker task")
+    parser.add_argument("--out", default="simulation.csv", help="CSV of rejection rates")
+    parser.add_argument("--plot", help="Optional HTML file with FPR/power curves")
+    args = parser.parse_args()
+
+    rows = sweep(
+        args.traffic, args.lift, args.experiments, args.days, args.conv_rate, args.aov,
+        args.aov_lift, args.revenue_sigma, args.mde, args.seed, args.workers, args.batch_size
+    )
+
+    with open(args.out, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} rows to {args.out}")
+
+    if args.plot:
+        create_curves_figure(rows).write_html(args.plot, include_plotlyjs="cdn")
+        print(f"Wrote curves to {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Batch sample ratio mismatch (SRM) screening.
+
+Screens every day of every experiment in one vectorized pass: each day's own
+split and the cumulative split up to that day are tested against the
+configured allocation with a chi-square test.
+
+Input is either one long CSV with an `experiment` column, or one daily series
+file per experiment (the experiment name is taken from the file name), with
+columns date, visitors_A, visitors_B and optionally variant_share.
+
+Usage:
+    python srm.py experiments.csv --out srm_daily.csv --summary srm_summary.csv
+    python srm.py daily/*.csv --variant-share 0.5
+"""
+import argparse
+import os
+
+import pandas as pd
+
+import stat_kernels
+from calculations import SRM_SIGNIFICANCE_LEVEL
+
+
+def screen_srm(daily, variant_share=0.5, alpha=SRM_SIGNIFICANCE_LEVEL):
+    """
+    Per-day and cumulative SRM tests for many experiments at once
+    daily: DataFrame with experiment, date, visitors_A, visitors_B and
+           optionally variant_share (overrides the default per row)
+    Returns (daily_results, summary):
+        daily_results  one row per experiment-day with p_value_day,
+                       p_value_cumulative and srm flags
+        summary        one row per experiment with overall p-value, number of
+                       flagged days and the first day the cumulative check failed
+    """
+    daily = daily.sort_values(["experiment", "date"]).reset_index(drop=True)
+    share = daily["variant_share"].to_numpy(dtype=float) if "variant_share" in daily else variant_share
+
+    visitors_A = daily["visitors_A"].to_numpy(dtype=float)
+    visitors_B = daily["visitors_B"].to_numpy(dtype=float)
+    cumulative = daily.groupby("experiment", sort=False)[["visitors_A", "visitors_B"]].cumsum()
+
+    _, p_day = stat_kernels.srm_test(visitors_A, visitors_B, share)
+    _, p_cumulative = stat_kernels.srm_test(
+        cumulative["visitors_A"].to_numpy(dtype=float), cumulative["visitors_B"].to_numpy(dtype=float), share
+    )
+
+    results = daily[["experiment", "date", "visitors_A", "visitors_B"]].copy()
+    results["p_value_day"] = p_day
+    results["p_value_cumulative"] = p_cumulative
+    results["srm_day"] = p_day < alpha
+    results["srm_cumulative"] = p_cumulative < alpha
+
+    grouped = results.groupby("experiment", sort=False)
+    summary = grouped.agg(
+        days=("date", "size"),
+        visitors_A=("visitors_A", "sum"),
+        visitors_B=("visitors_B", "sum"),
+        days_flagged=("srm_day", "sum"),
+        p_value=("p_value_cumulative", "last"),
+    )
+    summary["srm"] = summary["p_value"] < alpha
+    summary["first_flagged_date"] = results[results["srm_cumulative"]].groupby("experiment", sort=False)["date"].min()
+
+    return results, summary
+
+
+def read_experiments(paths):
+    """Long experiment/day frame from one combined CSV or one file per experiment"""
+    frames = []
+    for path in paths:
+        frame = pd.read_csv(path)
+        if "experiment" not in frame.columns:
+            frame["experiment"] = os.path.splitext(os.path.basename(path))[0]
+        frames.append(frame)
+
+    daily = pd.concat(frames, ignore_index=True)
+    daily["date"] = pd.to_datetime(daily["date"])
+    return daily
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen experiments for sample ratio mismatch")
+    parser.add_argument("paths", nargs="+", help="Daily CSV files")
+    parser.add_argument("--variant-share", type=float, default=0.5, help="Intended fraction of traffic in the variant")
+    parser.add_argument("--alpha", type=float, default=SRM_SIGNIFICANCE_LEVEL)
+    parser.add_argument("--out", default="srm_daily.csv", help="Per experiment-day results")
+    parser.add_argument("--summary", default="srm_summary.csv", help="Per experiment results")
+    args = parser.parse_args()
+
+    results, summary = screen_srm(read_experiments(args.paths), args.variant_share, args.alpha)
+    results.to_csv(args.out, index=False)
+    summary.to_csv(args.summary)
+
+    flagged = summary[summary["srm"]]
+    print(f"Screened {len(summary)} experiments, {len(results)} experiment-days: {len(flagged)} with SRM")
+    for experiment, row in flagged.iterrows():
+        print(f"  {experiment}: p = {row.p_value:.2e}, first flagged {row.first_flagged_date:%Y-%m-%d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Array-native statistical kernels.
+
+Every function accepts scalars or NumPy arrays (broadcast against each other)
+and is built on scipy.special, so evaluating a million comparisons is a
+handful of vectorized ufunc calls rather than a million trips through the
+scipy.stats distribution objects. Invalid comparisons (zero standard error,
+too few observations) come back as NaN instead of raising.
+"""
+import numpy as np
+from scipy import special
+
+
+def norm_cdf(x):
+    """Standard normal CDF"""
+    return special.ndtr(x)
+
+
+def norm_ppf(q):
+    """Standard normal quantile (inverse CDF)"""
+    return special.ndtri(q)
+
+
+def t_cdf(t, df):
+    """Student's t CDF with (possibly fractional) degrees of freedom"""
+    return special.stdtr(df, t)
+
+
+def t_ppf(q, df):
+    """Student's t quantile with (possibly fractional) degrees of freedom"""
+    return special.stdtrit(df, q)
+
+
+def p_value_z(z):
+    """Two-sided p-value for a z-statistic"""
+    # 2 * ndtr(-|z|) keeps precision in the tail where 1 - cdf would round to 0
+    return 2.0 * special.ndtr(-np.abs(z))
+
+
+def p_value_t(t, df):
+    """Two-sided p-value for a t-statistic"""
+    return 2.0 * special.stdtr(df, -np.abs(t))
+
+
+def z_test_proportions(conv_A, n_A, conv_B, n_B):
+    """
+    Pooled two-proportion z-test
+    conv_A, conv_B: conversion counts
+    n_A, n_B: visitor counts
+    Returns (z_stat, p_value); NaN where the pooled standard error is 0
+    """
+    conv_A = np.asarray(conv_A, dtype=float)
+    conv_B = np.asarray(conv_B, dtype=float)
+    n_A = np.asarray(n_A, dtype=float)
+    n_B = np.asarray(n_B, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_A = conv_A / n_A
+        p_B = conv_B / n_B
+        p_pooled = (conv_A + conv_B) / (n_A + n_B)
+        se = np.sqrt(p_pooled * (1 - p_pooled) * (1 / n_A + 1 / n_B))
+        z_stat = np.where(se > 0, (p_B - p_A) / se, np.nan)
+
+    return z_stat, p_value_z(z_stat)
+
+
+def welch_t_test(mean_A, sd_A, n_A, mean_B, sd_B, n_B):
+    """
+    Welch's t-test for unequal variances
+    Returns (t_stat, df, p_value); NaN where n < 2 or the standard error is 0
+    """
+    mean_A = np.asarray(mean_A, dtype=float)
+    mean_B = np.asarray(mean_B, dtype=float)
+    n_A = np.asarray(n_A, dtype=float)
+    n_B = np.asarray(n_B, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_A = np.asarray(sd_A, dtype=float) ** 2 / n_A
+        var_B = np.asarray(sd_B, dtype=float) ** 2 / n_B
+        se_diff = np.sqrt(var_A + var_B)
+        valid = (n_A >= 2) & (n_B >= 2) & (se_diff > 0)
+        t_stat = np.where(valid, (mean_B - mean_A) / se_diff, np.nan)
+        df = np.where(
+            valid,
+            (var_A + var_B) ** 2 / (var_A ** 2 / (n_A - 1) + var_B ** 2 / (n_B - 1)),
+            np.nan
+        )
+
+    return t_stat, df, p_value_t(t_stat, df)
+
+
+def sample_size_proportions(baseline_rate, mde, alpha=0.05, power=0.80):
+    """
+    Required sample size per variant for a two-proportion test (not rounded)
+    baseline_rate: baseline conversion rate as decimal
+    mde: relative minimum detectable effect as decimal
+    """
+    p1 = np.asarray(baseline_rate, dtype=float)
+    p2 = p1 * (1 + np.asarray(mde, dtype=float))
+
+    z_alpha = special.ndtri(1 - np.asarray(alpha, dtype=float) / 2)
+    z_beta = special.ndtri(np.asarray(power, dtype=float))
+    p_avg = (p1 + p2) / 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((z_alpha * np.sqrt(2 * p_avg * (1 - p_avg)) +
+                 z_beta * np.sqrt(p1 * (1 - p1) + p2 * (1 - p2))) ** 2) / ((p2 - p1) ** 2)
+
+
+def mean_sd_from_sums(n, total, total_sq):
+    """
+    Mean and sample standard deviation from sufficient statistics
+    n: observation count, total: sum of values, total_sq: sum of squared values
+    SD is 0 where n < 2
+    """
+    n = np.asarray(n, dtype=float)
+    total = np.asarray(total, dtype=float)
+    total_sq = np.asarray(total_sq, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(n > 0, total / n, 0.0)
+        # Clip tiny negative variances caused by floating point cancellation
+        var = np.where(n > 1, (total_sq - n * mean ** 2) / (n - 1), 0.0)
+
+    return mean, np.sqrt(np.clip(var, 0.0, None))
+
+
+def adjust_p_values(p_values, method="holm"):
+    """
+    Multiplicity-adjusted p-values along the last axis
+    method: "holm" (family-wise error), "bh" (Benjamini-Hochberg FDR)
+            or "bonferroni"
+    NaN p-values are left as NaN and do not count towards the family size
+    """
+    p = np.asarray(p_values, dtype=float)
+    valid = ~np.isnan(p)
+    m = valid.sum(axis=-1, keepdims=True)
+
+    if method == "bonferroni":
+        return np.where(valid, np.minimum(p * m, 1.0), np.nan)
+
+    # Sort with NaNs pushed to the end so ranks 1..m cover the valid tests
+    order = np.argsort(np.where(valid, p, np.inf), axis=-1)
+    p_sorted = np.take_along_axis(p, order, axis=-1)
+    rank = np.arange(1, p.shape[-1] + 1)
+
+    if method == "holm":
+        stepped = np.maximum.accumulate(np.nan_to_num((m - rank + 1) * p_sorted, nan=0.0), axis=-1)
+    elif method == "bh":
+        scaled = np.where(rank <= m, p_sorted * m / rank, np.inf)
+        stepped = np.minimum.accumulate(scaled[..., ::-1], axis=-1)[..., ::-1]
+    else:
+        raise ValueError(f"Unknown correction method: {method}")
+
+    adjusted = np.empty_like(p)
+    np.put_along_axis(adjusted, order, np.minimum(stepped, 1.0), axis=-1)
+    return np.where(valid, adjusted, np.nan)
+
+
+def heterogeneity_test(effect, se):
+    """
+    Cochran's Q test that an effect is the same in every segment
+    effect, se: per-segment effect estimates and standard errors (last axis)
+    Returns (q_stat, df, p_value); segments with a non-positive SE are skipped
+    """
+    effect = np.asarray(effect, dtype=float)
+    se = np.asarray(se, dtype=float)
+    valid = np.isfinite(effect) & (se > 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = np.where(valid, 1 / se ** 2, 0.0)
+        pooled = np.sum(w * np.where(valid, effect, 0.0), axis=-1, keepdims=True) / np.sum(w, axis=-1, keepdims=True)
+        q_stat = np.sum(w * np.where(valid, effect - pooled, 0.0) ** 2, axis=-1)
+
+    df = valid.sum(axis=-1) - 1
+    p_value = np.where(df > 0, special.chdtrc(np.maximum(df, 1), q_stat), np.nan)
+    return q_stat, df, p_value
+
+
+def sample_size_means(mean, sd, mde, alpha=0.05, power=0.80):
+    """
+    Required sample size per variant to detect a relative lift in a mean (not rounded)
+    mean, sd: baseline mean and standard deviation
+    mde: relative minimum detectable effect as decimal
+    """
+    z_alpha = special.ndtri(1 - np.asarray(alpha, dtype=float) / 2)
+    z_beta = special.ndtri(np.asarray(power, dtype=float))
+    delta = np.asarray(mean, dtype=float) * np.asarray(mde, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 2 * (z_alpha + z_beta) ** 2 * np.asarray(sd, dtype=float) ** 2 / delta ** 2
+
+
+def srm_test(n_A, n_B, variant_share=0.5):
+    """
+    Sample ratio mismatch: chi-square goodness of fit against the configured split
+    variant_share: intended fraction of traffic sent to B (decimal)
+    Returns (chi2_stat, p_value); NaN where there is no traffic
+    """
+    n_A = np.asarray(n_A, dtype=float)
+    n_B = np.asarray(n_B, dtype=float)
+    share = np.asarray(variant_share, dtype=float)
+    total = n_A + n_B
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected_A = total * (1 - share)
+        expected_B = total * share
+        chi2_stat = np.where(
+            total > 0,
+            (n_A - expected_A) ** 2 / expected_A + (n_B - expected_B) ** 2 / expected_B,
+            np.nan
+        )
+
+    return chi2_stat, special.chdtrc(1, chi2_stat)
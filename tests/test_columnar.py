@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pytest
+
+from columnar import read_arm_stats, resolve_export_path
+
+
+def test_export_paths_stay_inside_the_export_dir(tmp_path):
+    root = tmp_path / "exports"
+    root.mkdir()
+    (root / "orders.parquet").touch()
+    (tmp_path / "secret.parquet").touch()
+    os.symlink(tmp_path / "secret.parquet", root / "link.parquet")
+
+    assert resolve_export_path(str(root), "orders.parquet") == os.path.realpath(root / "orders.parquet")
+    assert resolve_export_path(str(root), str(root / "orders.parquet")) == os.path.realpath(root / "orders.parquet")
+    assert resolve_export_path(str(root), "../secret.parquet") is None
+    assert resolve_export_path(str(root), str(tmp_path / "secret.parquet")) is None
+    assert resolve_export_path(str(root), "link.parquet") is None
+    assert resolve_export_path(str(root), "/etc/passwd") is None
+
+
+def orders(arm_values):
+    arr = np.zeros(len(arm_values), dtype=[("arm", np.asarray(arm_values).dtype), ("revenue", "f8")])
+    arr["arm"] = arm_values
+    arr["revenue"][::2] = 10.0
+    return arr
+
+
+def test_float_arm_column_is_read_as_integer_labels(tmp_path):
+    path = str(tmp_path / "orders.npy")
+    np.save(path, orders([0.0, 1.0, 0.0, 1.0, np.nan, 1.0]))
+
+    stats = read_arm_stats(path)
+    assert (stats["visitors_A"], stats["visitors_B"]) == (2, 3)
+    assert (stats["conversions_A"], stats["conversions_B"]) == (2, 0)
+    assert stats["revenue_sum_A"] == 20.0
+
+
+def test_no_known_arm_label_raises(tmp_path):
+    path = str(tmp_path / "orders.npy")
+    np.save(path, orders([0.5, 2.5, 7.0]))
+
+    with pytest.raises(ValueError, match="known arm label"):
+        read_arm_stats(path)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import duration
+
+
+def daily_series(dates, visitors=1000, conversions=50):
+    daily = pd.DataFrame({"date": pd.to_datetime(dates)})
+    for arm in ("A", "B"):
+        daily[f"visitors_{arm}"] = visitors
+        daily[f"conversions_{arm}"] = conversions
+    return daily
+
+
+def test_days_elapsed_counts_calendar_days_not_rows():
+    model = {"level": 2000.0, "weekday_factors": np.ones(7)}
+    # 14 days with a 7-day gap: 7 rows, 14000 visitors so far
+    dates = list(pd.date_range("2024-01-01", periods=3)) + list(pd.date_range("2024-01-11", periods=4))
+    completion = duration.forecast_completion(daily_series(dates), model, [16000])
+
+    assert completion["days_needed"][0] == 15
+    assert completion["days_rounded"][0] == 21
+    assert completion["end_date"][0] == np.datetime64("2024-01-21")
+
+
+def test_series_baseline_from_sums():
+    daily = daily_series(pd.date_range("2024-01-01", periods=2), visitors=100, conversions=10)
+    baseline = duration.series_baseline(daily)
+    assert baseline["baseline_rate"] == pytest.approx(0.10)
+    assert baseline["aov"] is None
+
+    orders = np.array([20.0, 30.0, 40.0, 50.0] * 5)
+    daily["revenue_sum_A"] = orders.sum() / 2
+    daily["revenue_sumsq_A"] = (orders ** 2).sum() / 2
+    baseline = duration.series_baseline(daily)
+    revenue = np.concatenate([orders, np.zeros(180)])
+    assert baseline["aov"] == pytest.approx(orders.mean())
+    assert baseline["sd_aov"] == pytest.approx(orders.std(ddof=1))
+    assert baseline["arpu"] == pytest.approx(revenue.mean())
+    assert baseline["sd_arpu"] == pytest.approx(revenue.std(ddof=1))
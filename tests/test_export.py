@@ -0,0 +1,49 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc
+import pyarrow.parquet
+import pytest
+
+from export import EXPORT_SCHEMA, EXPORT_SCHEMA_VERSION, results_table, write_table
+
+
+def experiments():
+    return pd.DataFrame([
+        {"experiment": "checkout", "visitors_A": 10000, "conversions_A": 300, "revenue_sum_A": 30000.0,
+         "revenue_sumsq_A": 3.6e6, "visitors_B": 10000, "conversions_B": 340, "revenue_sum_B": 35000.0,
+         "revenue_sumsq_B": 4.2e6},
+        {"experiment": "untestable", "visitors_A": 500, "conversions_A": 0, "revenue_sum_A": 0.0,
+         "revenue_sumsq_A": 0.0, "visitors_B": 500, "conversions_B": 0, "revenue_sum_B": 0.0,
+         "revenue_sumsq_B": 0.0},
+    ])
+
+
+def read_back(path):
+    if path.endswith(".parquet"):
+        return pa.parquet.read_table(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".arrow"])
+def test_results_round_trip_with_stable_schema(tmp_path, extension):
+    path = str(tmp_path / f"results{extension}")
+    write_table(results_table(experiments()), path)
+    table = read_back(path)
+
+    assert table.schema.equals(EXPORT_SCHEMA, check_metadata=True)
+    assert table.schema.metadata[b"cro_export_schema_version"] == str(EXPORT_SCHEMA_VERSION).encode()
+    assert table.column("experiment").to_pylist() == ["checkout", "untestable"]
+
+    rows = table.to_pylist()
+    assert rows[0]["conversions_B"] == 340 and rows[0]["p_value_conv"] is not None
+    assert rows[0]["required_sample_per_variant"] > 0
+
+    # Undefined tests are nulls, never NaN
+    for field in ("z_stat_conv", "p_value_conv", "t_stat_aov", "p_value_aov", "required_sample_per_variant"):
+        assert rows[1][field] is None
+    assert rows[1]["verdict_conv"] == "untestable"
+    for field in EXPORT_SCHEMA:
+        if pa.types.is_floating(field.type):
+            assert not pc.any(pc.is_nan(table.column(field.name))).as_py(), field.name
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from quantiles import QuantileSketch, quantile_effects, sketch_values
+
+QS = [0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def order_values(n, scale=1.0, seed=0):
+    return np.random.default_rng(seed).lognormal(4.0, 0.8, n) * scale
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    values = order_values(200_000)
+    sketch = sketch_values(values, relative_accuracy=0.01)
+
+    assert sketch.count == len(values)
+    np.testing.assert_allclose(sketch.quantiles(QS), np.quantile(values, QS), rtol=0.01)
+
+
+def test_merge_equals_sketch_of_combined_data():
+    first, second = order_values(5000, seed=1), order_values(7000, scale=1.3, seed=2)
+    merged = sketch_values(first).merge(sketch_values(second))
+    combined = sketch_values(np.concatenate([first, second]))
+
+    np.testing.assert_array_equal(merged.counts, combined.counts)
+    np.testing.assert_array_equal(merged.quantiles(QS), combined.quantiles(QS))
+
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(relative_accuracy=0.02))
+
+
+def test_bootstrap_ci_detects_known_shift():
+    control = sketch_values(order_values(3000, seed=3))
+    variant = sketch_values(order_values(3000, scale=1.2, seed=4))
+
+    for effect in quantile_effects(control, variant, n_bootstrap=500):
+        assert effect["difference"] > 0
+        assert 0 < effect["ci_low"] < effect["difference"] < effect["ci_high"]
+        assert effect["significant"]
+        assert effect["relative_difference"] == pytest.approx(20, abs=8)
+
+
+def test_bootstrap_ci_covers_zero_without_shift():
+    values = order_values(3000, seed=5)
+    for effect in quantile_effects(sketch_values(values), sketch_values(values), n_bootstrap=500):
+        assert effect["difference"] == 0
+        assert effect["ci_low"] < 0 < effect["ci_high"]
+        assert not effect["significant"]
+
+
+def test_relative_difference_undefined_for_zero_control_quantile():
+    control = sketch_values([0.005, 0.01, 0.01, 5.0])
+    variant = sketch_values([20.0, 30.0, 40.0, 50.0])
+
+    effects = quantile_effects(control, variant, qs=[0.5], n_bootstrap=100)
+    assert effects[0]["control"] == 0
+    assert effects[0]["relative_difference"] is None
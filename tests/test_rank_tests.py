@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+import rank_tests
+from calculations import RANK_TEST_KEYS, analyze_experiment
+
+
+def samples(seed=0):
+    rng = np.random.default_rng(seed)
+    values_A = np.round(rng.lognormal(3.5, 1.0, 40), 0)
+    values_B = np.round(rng.lognormal(3.7, 1.0, 55), 0)
+    return 300, values_A, 280, values_B
+
+
+def test_mann_whitney_matches_scipy():
+    zeros_A, values_A, zeros_B, values_B = samples()
+    A = np.concatenate([np.zeros(zeros_A), values_A])
+    B = np.concatenate([np.zeros(zeros_B), values_B])
+
+    u_B, z, p_value, prob_superiority = rank_tests.mann_whitney_u(zeros_A, values_A, zeros_B, values_B)
+    expected = stats.mannwhitneyu(B, A, use_continuity=False, method="asymptotic")
+
+    assert u_B == pytest.approx(expected.statistic)
+    assert p_value == pytest.approx(expected.pvalue)
+    assert prob_superiority == pytest.approx(expected.statistic / (len(A) * len(B)))
+    assert z > 0
+
+
+def test_brunner_munzel_matches_scipy():
+    zeros_A, values_A, zeros_B, values_B = samples(1)
+    A = np.concatenate([np.zeros(zeros_A), values_A])
+    B = np.concatenate([np.zeros(zeros_B), values_B])
+
+    w, p_value, _ = rank_tests.brunner_munzel(zeros_A, values_A, zeros_B, values_B)
+    expected = stats.brunnermunzel(A, B, distribution="normal")
+
+    assert w == pytest.approx(expected.statistic)
+    assert p_value == pytest.approx(expected.pvalue)
+
+
+def test_rank_tests_skipped_when_order_values_are_missing():
+    partial = analyze_experiment(1000, 5, "10, 20, 30", 1000, 5, "15, 25, 35, 45, 55")
+    assert all(partial[key] is None for key in RANK_TEST_KEYS)
+    assert partial["p_value_arpu"] is not None
+
+    complete = analyze_experiment(1000, 3, "10, 20, 30", 1000, 5, "15, 25, 35, 45, 55")
+    assert all(complete[key] is not None for key in RANK_TEST_KEYS)
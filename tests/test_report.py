@@ -0,0 +1,20 @@
+import json
+import os
+
+import pandas as pd
+
+from report import INPUT_COLUMNS, generate_reports
+
+
+def test_experiment_names_never_overwrite_index_or_summary(tmp_path):
+    stats = {col: 100 for col in INPUT_COLUMNS[1:]}
+    names = ["index", "summary", "Checkout", "checkout"]
+    experiments = pd.DataFrame([dict(stats, experiment=name) for name in names])
+
+    entries = generate_reports(experiments, str(tmp_path), workers=1)
+
+    files = [entry["file"] for entry in entries]
+    assert files == ["index-2", "summary-2", "Checkout", "checkout-2"]
+    assert "4 experiments" in (tmp_path / "index.html").read_text(encoding="utf-8")
+    assert len(json.loads((tmp_path / "summary.json").read_text(encoding="utf-8"))) == 4
+    assert all(os.path.exists(tmp_path / f"{name}.html") for name in files)
@@ -0,0 +1,46 @@
+import sqlite3
+import time
+
+import result_cache
+from result_cache import ResultCache, make_key
+
+
+def test_hit_returns_value_and_miss_computes(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite"))
+    key = make_key("analysis", {"n_A": 10})
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"p_value": 0.04}
+
+    assert cache.get_or_compute(key, compute) == {"p_value": 0.04}
+    assert cache.get_or_compute(key, compute) == {"p_value": 0.04}
+    assert len(calls) == 1
+
+
+def test_hit_does_not_wait_for_a_writer(tmp_path, monkeypatch):
+    path = str(tmp_path / "results.sqlite")
+    cache = ResultCache(path)
+    key = make_key("analysis", {"n_A": 10})
+    cache.put(key, {"p_value": 0.04})
+    monkeypatch.setattr(result_cache, "TOUCH_INTERVAL", -1)
+
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.monotonic()
+        assert cache.get(key) == {"p_value": 0.04}
+        assert time.monotonic() - start < 5
+    finally:
+        writer.execute("ROLLBACK")
+
+
+def test_recent_hits_skip_the_touch(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite"))
+    key = make_key("analysis", {"n_A": 10})
+    cache.put(key, {"p_value": 0.04})
+    conn = cache._connection()
+    before = conn.execute("SELECT last_access FROM entries").fetchone()[0]
+    cache.get(key)
+    assert conn.execute("SELECT last_access FROM entries").fetchone()[0] == before
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from segments import aggregate_segments
+
+
+def visitors(revenue):
+    return pd.DataFrame({
+        "device": ["mobile", "desktop"] * 3,
+        "arm": ["control", "variant", "variant", "control", "A", "B"],
+        "country": ["US", "DE", "FR", "US", "UK", "US"],
+        "revenue": revenue,
+    })
+
+
+def test_blank_revenue_counts_as_no_purchase():
+    stats = aggregate_segments(visitors(["", "50.0", None, "20", "0", "12.5"]), "device")
+    assert stats.loc["mobile", "conversions_A"] == 0
+    assert stats.loc["mobile", "revenue_sum_B"] == 0
+    assert stats.loc["desktop", "revenue_sum_B"] == 62.5
+    assert stats[["conversions_A", "conversions_B"]].to_numpy().sum() == 3
+
+
+def test_non_numeric_revenue_column_raises():
+    with pytest.raises(ValueError, match="non-numeric"):
+        aggregate_segments(visitors([0, 50.0, 0, 20, 0, 12.5]), "device", revenue_col="country")
+
+
+def test_single_unparseable_revenue_value_raises():
+    with pytest.raises(ValueError, match="'1,234.50'"):
+        aggregate_segments(visitors(["", "50.0", None, "20", "1,234.50", "12.5"]), "device")
@@ -0,0 +1,16 @@
+from simulation import sweep
+
+PARAMS = dict(traffic_grid=[1000], lift_grid=[0.0], n_experiments=2000, days=14, seed=7, batch_size=250)
+
+
+def test_sweep_reproducible_across_workers_and_calibrated():
+    rows = sweep(workers=1, **PARAMS)
+    assert rows == sweep(workers=2, **PARAMS)
+
+    rates = {(row["metric"], row["rule"]): row for row in rows}
+    fixed = rates["conversion", "fixed_horizon"]
+    # A/A: the fixed-horizon rejection rate is the false positive rate
+    assert abs(fixed["rejection_rate"] - 0.05) < 4 * fixed["mc_std_error"]
+
+    for metric in ("conversion", "rpv", "aov"):
+        assert rates[metric, "daily_peeking"]["rejection_rate"] >= rates[metric, "fixed_horizon"]["rejection_rate"]
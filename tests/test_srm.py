@@ -0,0 +1,29 @@
+import pandas as pd
+
+from srm import screen_srm
+
+
+def experiment_days(name, visitors_B):
+    dates = pd.date_range("2024-03-01", periods=len(visitors_B))
+    return pd.DataFrame({"experiment": name, "date": dates, "visitors_A": 1000, "visitors_B": visitors_B})
+
+
+def test_screen_flags_skewed_day_and_first_cumulative_failure():
+    skewed = [1000] * 10
+    skewed[4] = 500
+    # Shuffled to check per-experiment ordering
+    daily = pd.concat([experiment_days("clean", [1000, 990, 1010] * 3 + [1000]), experiment_days("skewed", skewed)])
+    results, summary = screen_srm(daily.sample(frac=1, random_state=0))
+
+    clean = results[results["experiment"] == "clean"]
+    assert not clean["srm_day"].any() and not clean["srm_cumulative"].any()
+    assert summary.loc["clean", "days_flagged"] == 0
+    assert not summary.loc["clean", "srm"]
+    assert pd.isna(summary.loc["clean", "first_flagged_date"])
+
+    flagged = results[results["experiment"] == "skewed"].set_index("date")
+    assert flagged["srm_day"].tolist() == [day == 4 for day in range(10)]
+    assert summary.loc["skewed", "days_flagged"] == 1
+    assert summary.loc["skewed", "first_flagged_date"] == pd.Timestamp("2024-03-05")
+    assert summary.loc["skewed", "srm"]
+    assert summary.loc["skewed", "visitors_B"] == 9500
@@ -0,0 +1,92 @@
+"""Kernels and calculators against the original scipy.stats formulas"""
+import math
+
+import numpy as np
+import pytest
+from scipy import stats
+
+import stat_kernels
+from calculations import (
+    calculate_sample_size_per_variant,
+    calculate_welch_t_test,
+    calculate_z_test_conversion,
+)
+
+
+def scipy_welch(mean_A, sd_A, n_A, mean_B, sd_B, n_B):
+    se_diff = math.sqrt(sd_A ** 2 / n_A + sd_B ** 2 / n_B)
+    t_stat = (mean_B - mean_A) / se_diff
+    df = (sd_A ** 2 / n_A + sd_B ** 2 / n_B) ** 2 / (
+        (sd_A ** 2 / n_A) ** 2 / (n_A - 1) + (sd_B ** 2 / n_B) ** 2 / (n_B - 1)
+    )
+    return t_stat, df, 2 * stats.t.sf(abs(t_stat), df)
+
+
+def scipy_z_test(conv_A, n_A, conv_B, n_B):
+    p_A, p_B = conv_A / 100, conv_B / 100
+    p_pooled = (p_A * n_A + p_B * n_B) / (n_A + n_B)
+    se = math.sqrt(p_pooled * (1 - p_pooled) * (1 / n_A + 1 / n_B))
+    z_stat = (p_B - p_A) / se
+    return z_stat, 2 * stats.norm.sf(abs(z_stat))
+
+
+def scipy_sample_size(baseline_rate, mde, alpha=0.05, power=0.80):
+    p1, p2 = baseline_rate, baseline_rate * (1 + mde)
+    z_alpha, z_beta = stats.norm.ppf(1 - alpha / 2), stats.norm.ppf(power)
+    p_avg = (p1 + p2) / 2
+    n = ((z_alpha * math.sqrt(2 * p_avg * (1 - p_avg)) +
+          z_beta * math.sqrt(p1 * (1 - p1) + p2 * (1 - p2))) ** 2) / ((p2 - p1) ** 2)
+    return math.ceil(n)
+
+
+@pytest.mark.parametrize("args", [
+    (2.96, 17.5, 10000, 3.49, 19.5, 10000),
+    (95.0, 40.0, 280, 101.0, 55.0, 312),
+    (10.0, 1.0, 2, 12.0, 3.0, 5),
+    (0.5, 2.0, 1_000_000, 0.51, 2.2, 900_000),
+])
+def test_welch_matches_scipy(args):
+    np.testing.assert_allclose(calculate_welch_t_test(*args), scipy_welch(*args), rtol=1e-9)
+
+
+@pytest.mark.parametrize("args", [
+    (2.8, 10000, 3.12, 10000),
+    (50.0, 40, 60.0, 35),
+    (0.1, 2_000_000, 0.11, 2_100_000),
+])
+def test_z_test_matches_scipy(args):
+    np.testing.assert_allclose(calculate_z_test_conversion(*args), scipy_z_test(*args), rtol=1e-9)
+
+
+@pytest.mark.parametrize("baseline_rate, mde", [(0.028, 0.10), (0.5, 0.05), (0.001, 0.2), (0.3, 0.01)])
+def test_sample_size_matches_scipy(baseline_rate, mde):
+    assert calculate_sample_size_per_variant(baseline_rate, mde) == scipy_sample_size(baseline_rate, mde)
+
+
+@pytest.mark.parametrize("baseline_rate, mde", [(0.0, 0.10), (1.0, 0.10), (0.05, 0.0)])
+def test_sample_size_undefined_is_none(baseline_rate, mde):
+    assert calculate_sample_size_per_variant(baseline_rate, mde) is None
+
+
+def test_kernels_broadcast_like_scalar_calls():
+    rng = np.random.default_rng(0)
+    n_A, n_B = rng.integers(2, 5000, 50), rng.integers(2, 5000, 50)
+    conv_A, conv_B = rng.binomial(n_A, 0.05), rng.binomial(n_B, 0.06)
+
+    z_stat, p_value = stat_kernels.z_test_proportions(conv_A, n_A, conv_B, n_B)
+    for i in range(len(n_A)):
+        expected = scipy_z_test(conv_A[i] / n_A[i] * 100, n_A[i], conv_B[i] / n_B[i] * 100, n_B[i])
+        np.testing.assert_allclose((z_stat[i], p_value[i]), expected, rtol=1e-9)
+
+
+def test_invalid_comparisons_are_nan_or_none():
+    assert calculate_welch_t_test(1.0, 0.0, 10, 1.0, 0.0, 10) == (None, None, None)
+    assert calculate_welch_t_test(1.0, 1.0, 1, 2.0, 1.0, 10) == (None, None, None)
+    assert calculate_z_test_conversion(0.0, 100, 0.0, 100) == (None, None)
+    assert np.isnan(stat_kernels.srm_test(0, 0)[0])
+
+
+def test_srm_matches_scipy_chisquare():
+    chi2_stat, p_value = stat_kernels.srm_test(5100, 4900, 0.5)
+    expected = stats.chisquare([5100, 4900], [5000, 5000])
+    np.testing.assert_allclose((chi2_stat, p_value), (expected.statistic, expected.pvalue), rtol=1e-9)
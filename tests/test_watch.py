@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+
+from watch import WatchState, poll, read_appended
+
+HEADER = "date,visitors_A,visitors_B,conversions_A,conversions_B\n"
+
+
+def day_line(day, conversions_B=15):
+    date = (pd.Timestamp("2024-01-01") + pd.Timedelta(days=day)).date().isoformat()
+    return f"{date},500,500,14,{conversions_B}\n"
+
+
+def write(path, text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_append_and_partial_line(tmp_path):
+    path = tmp_path / "checkout.csv"
+    path.write_text(HEADER + day_line(0) + day_line(1))
+    rows, position, rewritten = read_appended(path)
+    assert len(rows) == 2 and rewritten
+
+    partial = day_line(2)
+    with open(path, "a") as f:
+        f.write(partial[:10])
+    rows, position, rewritten = read_appended(path, position)
+    assert len(rows) == 0 and not rewritten
+
+    with open(path, "a") as f:
+        f.write(partial[10:] + day_line(3))
+    rows, position, rewritten = read_appended(path, position)
+    assert list(rows["date"]) == ["2024-01-03", "2024-01-04"] and not rewritten
+
+
+def test_mid_file_restatement_is_reread(tmp_path):
+    path = tmp_path / "checkout.csv"
+    lines = [day_line(day) for day in range(400)]
+    write(path, HEADER + "".join(lines), 1_000_000_000)
+    state = WatchState(str(tmp_path / "state.sqlite"))
+
+    updated, _, errors = poll(str(tmp_path), state)
+    assert updated == ["checkout"] and not errors
+    assert state.get("checkout")[1]["conversions_B"] == 400 * 15
+
+    # Same size, deep inside the file: only hashing everything read so far catches it
+    lines[200] = day_line(200, conversions_B=45)
+    write(path, HEADER + "".join(lines), 2_000_000_000)
+    updated, _, errors = poll(str(tmp_path), state)
+    assert updated == ["checkout"] and not errors
+    assert state.get("checkout")[1]["conversions_B"] == 400 * 15 + 30
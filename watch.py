@@ -0,0 +1,330 @@
+"""
+Watch mode: re-evaluate only the experiments whose daily files changed.
+
+Watches a directory with one daily series CSV per experiment (the format of
+duration.py, named after the experiment, optionally with a variant_share
+column). Each file's fingerprint (size and modification time), read offset
+and running sufficient statistics are kept in a SQLite state file. When a
+file grows, only the complete lines appended since the last read are parsed
+and folded into the stored sums. A file that shrank or whose already-read
+part changed is re-read in full.
+
+Only changed experiments get their z-test, Welch tests, SRM check and
+duration status re-run, with the same code as the batch reports. An alert is
+printed (and optionally appended to a JSON lines file) when a metric becomes
+or stops being significant, the SRM check flips, or the test becomes ready
+to conclude. An idle poll costs one stat() per file; no file is opened.
+
+Usage:
+    python watch.py daily/ --state watch_state.sqlite --interval 60 --alerts alerts.jsonl
+    python watch.py daily/ --once    # single pass, e.g. from cron after the nightly drop
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from calculations import MIN_TEST_DAYS, calculate_days_needed, calculate_sample_size_per_variant
+from duration import DAILY_COLUMNS
+from report import INPUT_COLUMNS, METRICS, build_report
+
+# Bytes per read when hashing the already-read part of a changed file
+HASH_CHUNK_BYTES = 1 << 20
+
+STAT_KEYS = INPUT_COLUMNS[1:]
+
+
+class WatchState:
+    """Per-experiment fingerprints, read positions, statistics and last report in SQLite"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS experiments (
+                name TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                position TEXT NOT NULL,
+                stats TEXT NOT NULL,
+                report TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def fingerprints(self):
+        """{name: (size, mtime_ns)} for every tracked experiment"""
+        return {name: (size, mtime_ns) for name, size, mtime_ns in
+                self.conn.execute("SELECT name, size, mtime_ns FROM experiments")}
+
+    def get(self, name):
+        """(position, stats, report) for an experiment, or None if untracked"""
+        row = self.conn.execute(
+            "SELECT position, stats, report FROM experiments WHERE name = ?", (name,)
+        ).fetchone()
+        return None if row is None else tuple(json.loads(value) for value in row)
+
+    def put(self, name, size, mtime_ns, position, stats, report):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO experiments (name, size, mtime_ns, position, stats, report, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (name, size, mtime_ns, json.dumps(position), json.dumps(stats), json.dumps(report), time.time())
+        )
+
+    def delete(self, name):
+        self.conn.execute("DELETE FROM experiments WHERE name = ?", (name,))
+
+
+def _prefix_hasher(f, offset):
+    """SHA-256 object fed the first offset bytes of f, read in chunks"""
+    hasher = hashlib.sha256()
+    f.seek(0)
+    remaining = offset
+    while remaining > 0:
+        chunk = f.read(min(HASH_CHUNK_BYTES, remaining))
+        if not chunk:
+            break
+        hasher.update(chunk)
+        remaining -= len(chunk)
+    return hasher
+
+
+def read_appended(path, position=None):
+    """
+    Complete CSV lines appended since the last read
+    position: the position returned by the previous call, or None
+    A trailing partial line (a file still being written) is left for the
+    next read. Returns (rows, position, rewritten): rows is a DataFrame of
+    the new lines, and rewritten is True when the file no longer starts with
+    what was read before, in which case every row is returned. The whole
+    already-read part is hashed, so a restated day anywhere in the file is
+    caught.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        rewritten = True
+        if position is not None and size >= position["offset"]:
+            hasher = _prefix_hasher(f, position["offset"])
+            rewritten = hasher.hexdigest() != position.get("prefix_hash")
+
+        if rewritten:
+            f.seek(0)
+            header = f.readline()
+            if not header.endswith(b"\n"):
+                header = b""
+            start = f.tell() if header else 0
+            hasher = hashlib.sha256(header)
+        else:
+            header = position["header"].encode("utf-8")
+            start = position["offset"]
+
+        f.seek(start)
+        data = f.read()
+        data = data[:data.rfind(b"\n") + 1]
+        offset = start + len(data)
+        hasher.update(data)
+
+    rows = pd.read_csv(io.BytesIO(header + data)) if header and data else pd.DataFrame()
+    position = {"offset": offset, "header": header.decode("utf-8"), "prefix_hash": hasher.hexdigest()}
+    return rows, position, rewritten
+
+
+def fold_rows(stats, rows):
+    """
+    Add a batch of daily rows to running sufficient statistics
+    stats: dict from a previous call, or None to start from zero. Missing
+    revenue columns count as 0 (revenue tests are then reported as untestable).
+    """
+    missing = [col for col in DAILY_COLUMNS if col not in rows.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    stats = dict(stats) if stats else dict.fromkeys(STAT_KEYS, 0.0)
+    for key in STAT_KEYS:
+        if key in rows.columns:
+            stats[key] += float(pd.to_numeric(rows[key], errors="coerce").fillna(0).sum())
+
+    dates = pd.to_datetime(rows["date"]).dt.normalize()
+    first, last = dates.min().date().isoformat(), dates.max().date().isoformat()
+    stats["first_date"] = min(first, stats.get("first_date") or first)
+    stats["last_date"] = max(last, stats.get("last_date") or last)
+    if "variant_share" in rows.columns and rows["variant_share"].notna().any():
+        stats["variant_share"] = float(rows["variant_share"].dropna().iloc[-1])
+    return stats
+
+
+def duration_status(stats, mde):
+    """
+    The page's duration advice from running totals
+    Days live is the calendar span of the data. Returns required_total,
+    days_needed, additional_days (None where undefined) and ready (required
+    sample reached and at least MIN_TEST_DAYS run).
+    """
+    days_live = (pd.Timestamp(stats["last_date"]) - pd.Timestamp(stats["first_date"])).days + 1
+    total_visitors = stats["visitors_A"] + stats["visitors_B"]
+    baseline_rate = stats["conversions_A"] / stats["visitors_A"] if stats["visitors_A"] > 0 else 0
+
+    status = {"days_live": days_live, "total_visitors": total_visitors, "mde": mde,
+              "required_total": None, "days_needed": None, "additional_days": None, "ready": False}
+    required_per_variant = calculate_sample_size_per_variant(baseline_rate, mde)
+    if required_per_variant is None:
+        return status
+
+    status["required_total"] = required_per_variant * 2
+    days_result = calculate_days_needed(status["required_total"], total_visitors, days_live)
+    if days_result:
+        status["days_needed"], status["additional_days"] = days_result
+    status["ready"] = total_visitors >= status["required_total"] and days_live >= MIN_TEST_DAYS
+    return status
+
+
+def evaluate(name, stats, mde, variant_share=0.5):
+    """Report for one experiment (as report.build_report) plus its duration status"""
+    row = {"experiment": name, **{key: stats[key] for key in STAT_KEYS},
+           "variant_share": stats.get("variant_share", variant_share)}
+    report = build_report(row)
+    report["duration"] = duration_status(stats, mde)
+    return report
+
+
+def status_changes(previous, current):
+    """
+    Alerts for flips between two reports of one experiment
+    previous may be None (a new experiment), which counts as not significant,
+    no SRM and not ready, so new experiments alert on anything notable.
+    """
+    alerts = []
+    experiment = current["experiment"]
+    previous_verdicts = previous["verdicts"] if previous else {}
+
+    for key, name, _, _ in METRICS:
+        was, now = previous_verdicts.get(key), current["verdicts"][key]
+        if (was == "significant") != (now == "significant"):
+            p_value = current["results"][f"p_value_{key}"]
+            if now == "significant":
+                message = f"{name} is now significant (p = {p_value:.4f}, lift {current['results'][f'{key}_lift']:+.2f}%)"
+            else:
+                message = f"{name} is no longer significant (now {now.replace('_', ' ')})"
+            alerts.append({"experiment": experiment, "type": "significance", "metric": key,
+                           "from": was, "to": now, "p_value": p_value, "message": message})
+
+    was_srm = previous["srm"]["mismatch"] if previous else False
+    if was_srm != current["srm"]["mismatch"]:
+        if current["srm"]["mismatch"]:
+            message = f"Sample ratio mismatch (p = {current['srm']['p_value']:.2e}); verdicts withheld"
+        else:
+            message = "Sample ratio mismatch cleared"
+        alerts.append({"experiment": experiment, "type": "srm", "from": was_srm, "to": current["srm"]["mismatch"],
+                       "p_value": current["srm"]["p_value"], "message": message})
+
+    was_ready = previous["duration"]["ready"] if previous else False
+    if was_ready != current["duration"]["ready"]:
+        duration = current["duration"]
+        if duration["ready"]:
+            message = f"Ready to conclude ({duration['total_visitors']:,.0f} visitors, {duration['days_live']} days)"
+        else:
+            message = "No longer ready to conclude"
+        alerts.append({"experiment": experiment, "type": "ready", "from": was_ready, "to": duration["ready"],
+                       "message": message})
+
+    return alerts
+
+
+def poll(directory, state, mde=0.10, variant_share=0.5):
+    """
+    One pass over the directory: fold new rows of changed files and re-evaluate them
+    Returns (updated experiment names, alerts, errors as {name: message})
+    """
+    fingerprints = state.fingerprints()
+    seen = set()
+    updated = []
+    alerts = []
+    errors = {}
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".csv") or not entry.is_file():
+                continue
+            name = entry.name[:-4]
+            seen.add(name)
+            info = entry.stat()
+            if fingerprints.get(name) == (info.st_size, info.st_mtime_ns):
+                continue
+
+            stored = state.get(name)
+            position, stats, previous = stored if stored else (None, None, None)
+            try:
+                rows, position, rewritten = read_appended(entry.path, position)
+                if rewritten:
+                    stats = None
+                if len(rows):
+                    stats = fold_rows(stats, rows)
+            except (OSError, ValueError, pd.errors.ParserError) as e:
+                errors[name] = str(e)
+                continue
+
+            if stats is None:
+                # No complete data rows yet (or any more)
+                state.delete(name)
+                continue
+            if not len(rows) and not rewritten:
+                # Only a partial line was appended: nothing to re-evaluate
+                state.put(name, info.st_size, info.st_mtime_ns, position, stats, previous)
+                continue
+            report = evaluate(name, stats, mde, variant_share)
+            state.put(name, info.st_size, info.st_mtime_ns, position, stats, report)
+            updated.append(name)
+            alerts.extend(status_changes(previous, report))
+
+    for name in set(fingerprints) - seen:
+        state.delete(name)
+
+    return updated, alerts, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-evaluate experiments when their daily files change")
+    parser.add_argument("directory", help="Directory with one daily series CSV per experiment")
+    parser.add_argument("--state", default="watch_state.sqlite", help="SQLite file with fingerprints and running statistics")
+    parser.add_argument("--interval", type=float, default=60, help="Seconds between polls")
+    parser.add_argument("--mde", type=float, default=0.10, help="MDE (decimal) for the required sample size")
+    parser.add_argument("--variant-share", type=float, default=0.5, help="Intended variant share where files have no variant_share column")
+    parser.add_argument("--alerts", help="Optional JSON lines file alerts are appended to")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit")
+    args = parser.parse_args()
+
+    state = WatchState(args.state)
+    try:
+        while True:
+            updated, alerts, errors = poll(args.directory, state, args.mde, args.variant_share)
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+            for name, message in errors.items():
+                print(f"{stamp} [{name}] could not read: {message}")
+            for alert in alerts:
+                print(f"{stamp} [{alert['experiment']}] {alert['message']}")
+            if alerts and args.alerts:
+                with open(args.alerts, "a", encoding="utf-8") as f:
+                    for alert in alerts:
+                        f.write(json.dumps(dict(alert, time=stamp)) + "\n")
+            if updated:
+                print(f"{stamp} Re-evaluated {len(updated)} experiment(s)")
+
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()